@@ -0,0 +1,4 @@
+"""
+VOICE4BLIND — Benchmarks
+Run from backend/:  python -m benchmarks.<name>
+"""
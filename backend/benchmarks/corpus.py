@@ -0,0 +1,177 @@
+"""
+VOICE4BLIND — Synthetic Benchmark Corpus
+Deterministic documents of a given size, generated locally: PDF pages
+with text, images and ruled tables, DOCX with headings and tables, EPUB
+chapters, plain text. Same seed, same bytes in, so timings from two runs
+compare like for like.
+"""
+
+import random
+import pathlib
+import itertools
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bump when generated documents change, so cached files are not reused
+CORPUS_VERSION = 1
+WORDS_PER_PAGE = 350
+WIDE_VOCABULARY_SIZE = 20000
+
+_VOCABULARY = (
+    "energy plants light water cells growth system process carbon oxygen "
+    "roots leaves sunlight food chain animals nature soil river climate "
+    "temperature pressure force motion speed mass volume density matter "
+    "atoms molecules reaction acid base salt metal heat sound wave signal "
+    "history culture society trade empire kingdom village farmer market "
+    "number equation graph table figure chapter section example result"
+).split()
+
+
+@lru_cache(maxsize=1)
+def wide_vocabulary(size: int = WIDE_VOCABULARY_SIZE) -> Tuple[List[str], List[float]]:
+    """
+    `size` distinct pseudo-words with Zipf cumulative weights, like the
+    vocabulary of a real textbook chapter (the default list has ~70 words,
+    which hides costs that grow with vocabulary size).
+    """
+    rng = random.Random(size)
+    syllables = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"]
+    words: Dict[str, None] = {}
+    while len(words) < size:
+        words["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))] = None
+    return list(words), list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+def make_sentences(rng: random.Random, words: int,
+                   vocabulary: Optional[Tuple[Sequence[str], Sequence[float]]] = None) -> List[str]:
+    """Sentences of 8–20 words totalling about `words`, from the default or a weighted vocabulary."""
+    sentences, total = [], 0
+    while total < words:
+        n = rng.randint(8, 20)
+        if vocabulary is None:
+            body = " ".join(rng.choice(_VOCABULARY) for _ in range(n))
+        else:
+            body = " ".join(rng.choices(vocabulary[0], cum_weights=vocabulary[1], k=n))
+        sentences.append(body[0].upper() + body[1:] + rng.choice(".....?!"))
+        total += n
+    return sentences
+
+
+def make_text(words: int, seed: int = 0,
+              vocabulary: Optional[Tuple[Sequence[str], Sequence[float]]] = None) -> str:
+    rng = random.Random(seed)
+    sentences = make_sentences(rng, words, vocabulary)
+    # Paragraphs of 5 sentences, like extracted page text
+    return "\n".join(" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Writers: (path, pages, seed) → path. A "page" is ~WORDS_PER_PAGE words;
+# every 4th page carries an image and every 5th a table.
+# ─────────────────────────────────────────────────────────────────────────────
+def write_txt(path: pathlib.Path, pages: int, seed: int = 0) -> pathlib.Path:
+    path.write_text(make_text(pages * WORDS_PER_PAGE, seed), encoding="utf-8")
+    return path
+
+
+def write_pdf(path: pathlib.Path, pages: int, seed: int = 0) -> pathlib.Path:
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 48), False)
+    pixmap.clear_with(200)
+    toc = []
+    for pno in range(pages):
+        page = doc.new_page()
+        top  = 40
+        if pno % 10 == 0:
+            title = f"Chapter {pno // 10 + 1}"
+            page.insert_text((40, top), title, fontsize=16)
+            toc.append([1, title, pno + 1])
+            top += 20
+        if pno % 4 == 3:
+            page.insert_image(fitz.Rect(40, top, 200, top + 120), pixmap=pixmap)
+            top += 130
+        if pno % 5 == 4:
+            top = _draw_table(page, rng, top, rows=5, cols=4) + 10
+        text = " ".join(make_sentences(rng, WORDS_PER_PAGE))
+        page.insert_textbox(fitz.Rect(40, top, 555, 800), text, fontsize=7)
+    doc.set_toc(toc)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def _draw_table(page, rng: random.Random, top: float, rows: int, cols: int) -> float:
+    """Ruled grid with a word per cell, so find_tables() sees a real table."""
+    import fitz
+
+    width, height = 90, 16
+    for r in range(rows):
+        for c in range(cols):
+            cell = fitz.Rect(40 + c * width, top + r * height, 40 + (c + 1) * width, top + (r + 1) * height)
+            page.draw_rect(cell, color=(0, 0, 0), width=0.8)
+            page.insert_text((cell.x0 + 3, cell.y1 - 4), rng.choice(_VOCABULARY), fontsize=8)
+    return top + rows * height
+
+
+def write_docx(path: pathlib.Path, pages: int, seed: int = 0) -> pathlib.Path:
+    from docx import Document
+
+    rng = random.Random(seed)
+    doc = Document()
+    for pno in range(pages):
+        if pno % 10 == 0:
+            doc.add_heading(f"Chapter {pno // 10 + 1}", level=1)
+        sentences = make_sentences(rng, WORDS_PER_PAGE)
+        for i in range(0, len(sentences), 5):
+            doc.add_paragraph(" ".join(sentences[i:i + 5]))
+        if pno % 5 == 4:
+            table = doc.add_table(rows=5, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(_VOCABULARY)
+    doc.save(str(path))
+    return path
+
+
+def write_epub(path: pathlib.Path, pages: int, seed: int = 0) -> pathlib.Path:
+    from ebooklib import epub
+
+    rng  = random.Random(seed)
+    book = epub.EpubBook()
+    book.set_identifier(f"bench-{pages}-{seed}")
+    book.set_title(f"Benchmark {pages}")
+    book.set_language("en")
+    chapters = []
+    # One XHTML document per ~5 pages, as in typical textbooks
+    for n, first in enumerate(range(0, pages, 5), 1):
+        paragraphs = "".join(
+            f"<p>{' '.join(make_sentences(rng, WORDS_PER_PAGE))}</p>"
+            for _ in range(first, min(first + 5, pages))
+        )
+        chapter = epub.EpubHtml(title=f"Chapter {n}", file_name=f"c{n}.xhtml", lang="en")
+        chapter.content = f"<h1>Chapter {n}</h1>{paragraphs}"
+        book.add_item(chapter)
+        chapters.append(chapter)
+    book.toc = [epub.Link(c.file_name, c.title, c.file_name) for c in chapters]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ["nav"] + chapters
+    epub.write_epub(str(path), book)
+    return path
+
+
+WRITERS: Dict[str, Callable[[pathlib.Path, int, int], pathlib.Path]] = {
+    ".pdf": write_pdf, ".docx": write_docx, ".epub": write_epub, ".txt": write_txt,
+}
+
+
+def generate(directory: pathlib.Path, ext: str, pages: int, seed: int = 0) -> pathlib.Path:
+    """Write (or reuse) the synthetic document for ext / pages / seed."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"bench_v{CORPUS_VERSION}_{pages}p_s{seed}{ext}"
+    if not path.exists():
+        WRITERS[ext](path, pages, seed)
+    return path
@@ -0,0 +1,126 @@
+"""
+VOICE4BLIND — Intent Classifier Benchmark
+Per-utterance latency of classify() against the original rule loop
+(kept here as the reference), a check that the compiled matcher's top
+rule agrees with it, the utterances the n-gram scorer re-ranks, and the
+intents a few ambiguous utterances must resolve to (EXPECTED).
+
+    python -m benchmarks.intent_bench [--rounds 2000]
+"""
+
+import re
+import sys
+import time
+import argparse
+import statistics
+from typing import Callable, List, Optional
+
+from modules.intent_classifier import (
+    INTENT_RULES, LANG_PATTERNS, SCORER, Intent, classify, _RESULT, _RULES, _rule_matches,
+)
+
+UTTERANCES = [
+    "hello", "start reading", "read file two", "open the third file",
+    "pause", "please continue", "next chapter", "go back", "repeat that again",
+    "summarize this section", "explain in simple words", "key points please",
+    "speak louder", "volume down", "read slowly", "speed up a bit",
+    "i didn't understand", "describe the chart", "log out", "switch to hindi",
+    "change language to kannada", "tamil mein padho", "हिंदी में पढ़ो",
+    "ಕನ್ನಡ", "username harini", "password one two three four",
+    "scan my documents", "yes", "no that's wrong", "what is the weather today",
+    "can you please read the next section slowly and then summarize it for me",
+    "sumarize", "contineu reading", "volume upp",
+]
+
+# Utterances several rules match, or none, and what they must mean
+EXPECTED = {
+    "repeat": "repeat", "again": "repeat", "repeat that again": "repeat",
+    "no": "deny", "no that's wrong": "deny",
+    "start reading": "start_read", "read slowly": "slower", "read file two": "open_file",
+    "sumarize": "summarize", "contineu reading": "resume", "volume upp": "louder",
+}
+
+
+def classify_reference(text: str) -> Intent:
+    """The pre-compilation classifier: one re.search per pattern, in order."""
+    t = text.lower().strip()
+    for lang, patterns in LANG_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, t):
+                return Intent(name="change_language", confidence=0.95, payload={"language": lang})
+    for intent_name, patterns in INTENT_RULES:
+        for pattern in patterns:
+            if re.search(pattern, t):
+                return Intent(name=intent_name, confidence=0.9)
+    return Intent(name="unknown", confidence=0.0)
+
+
+def top_rule(text: str) -> Intent:
+    """The compiled matcher's highest-priority rule, before any re-ranking."""
+    found = _rule_matches(text.lower().strip())
+    if not found:
+        return Intent(name="unknown", confidence=0.0)
+    hit = _RESULT[_RULES[min(found)][0]]
+    return Intent(hit.name, hit.confidence, hit.payload)
+
+
+def classify_unmemoized(text: str) -> Intent:
+    """classify() as for an utterance the scorer has not seen before."""
+    if SCORER is not None:
+        SCORER.clear()
+    return classify(text)
+
+
+def time_per_call(fn: Callable[[str], Intent], utterances: List[str], rounds: int) -> List[float]:
+    """Microseconds per utterance, one sample per round."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for u in utterances:
+            fn(u)
+        samples.append((time.perf_counter() - start) / len(utterances) * 1e6)
+    return samples
+
+
+def summarize(samples: List[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "median_us": round(statistics.median(samples), 2),
+        "p95_us":    round(samples[int(len(samples) * 0.95) - 1], 2),
+        "min_us":    round(samples[0], 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    mismatches = [
+        (u, top_rule(u), classify_reference(u))
+        for u in UTTERANCES if top_rule(u) != classify_reference(u)
+    ]
+    for u, got, want in mismatches:
+        print(f"MISMATCH {u!r}: {got} != {want}")
+    for u in UTTERANCES:
+        got, rule = classify(u), classify_reference(u)
+        if got.name != rule.name:
+            print(f"re-ranked {u!r}: {rule.name} → {got.name} ({got.confidence})")
+    wrong = [(u, classify(u).name, want) for u, want in EXPECTED.items() if classify(u).name != want]
+    for u, got, want in wrong:
+        print(f"WRONG {u!r}: {got} != {want}")
+
+    compiled  = summarize(time_per_call(classify, UTTERANCES, args.rounds))
+    cold      = summarize(time_per_call(classify_unmemoized, UTTERANCES, args.rounds))
+    reference = summarize(time_per_call(classify_reference, UTTERANCES, args.rounds))
+    print(f"{len(UTTERANCES)} utterances × {args.rounds} rounds")
+    print(f"  compiled   {compiled}")
+    print(f"  unmemoized {cold}")
+    print(f"  reference  {reference}")
+    print(f"  speed-up   {reference['median_us'] / compiled['median_us']:.1f}x "
+          f"({reference['median_us'] / cold['median_us']:.1f}x unmemoized)")
+    return 1 if mismatches or wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+VOICE4BLIND — Pipeline Benchmark
+Times extraction (PDF / DOCX / EPUB / TXT), chunk_text, classify,
+local_summarize and extract_key_points across document sizes on a
+synthetic corpus, with throughput and tracemalloc peak memory, and
+saves / compares JSON baselines. The *.wide stages summarize text drawn
+from a 20k-word Zipf vocabulary, where vocabulary-sized costs show up.
+
+    python -m benchmarks.pipeline_bench [--sizes 5,20,80] [--repeats 5]
+        [--only extract.pdf,chunk] [--save base.json] [--compare base.json]
+
+Peak memory counts Python allocations only; memory held inside MuPDF
+(C) is not traced.
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import pathlib
+import tempfile
+import statistics
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import CORPUS_VERSION, WORDS_PER_PAGE, WRITERS, generate, make_text, wide_vocabulary
+from benchmarks.intent_bench import UTTERANCES
+from modules.document_processor import (
+    chunk_text, extract_key_points, extract_text, extractor_available, local_summarize, clear_term_stats,
+)
+from modules.intent_classifier import classify
+
+# A stage: size in pages → (callable, {unit: count}) for one timed run
+Stage = Callable[[int], Tuple[Callable[[], object], Dict[str, int]]]
+
+
+def measure(fn: Callable[[], object], repeats: int) -> dict:
+    """Median / min seconds over `repeats` runs after one warm-up, then one traced run."""
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    # Separate run: tracing slows allocation-heavy code several-fold
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_s": round(statistics.median(samples), 6),
+        "min_s":    round(min(samples), 6),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stages
+# ─────────────────────────────────────────────────────────────────────────────
+def build_stages(corpus: pathlib.Path) -> Dict[str, Stage]:
+    texts: Dict[int, str] = {}
+    wide:  Dict[int, str] = {}
+
+    def text(pages: int) -> str:
+        # Summaries and chunking run on extracted PDF text, as in the app
+        if pages not in texts:
+            texts[pages] = extract_text(str(generate(corpus, ".pdf", pages)))
+        return texts[pages]
+
+    def wide_text(pages: int) -> str:
+        if pages not in wide:
+            wide[pages] = make_text(pages * WORDS_PER_PAGE, vocabulary=wide_vocabulary())
+        return wide[pages]
+
+    def extract(ext: str) -> Stage:
+        def stage(pages: int):
+            path = str(generate(corpus, ext, pages))
+            words = len(extract_text(path).split())
+            return (lambda: extract_text(path)), {"pages": pages, "words": words}
+        return stage
+
+    def chunk(pages: int):
+        t = text(pages)
+        return (lambda: chunk_text(t)), {"words": len(t.split())}
+
+    def summarizer(fn: Callable[[str], str], source: Callable[[int], str]) -> Stage:
+        def stage(pages: int):
+            t = source(pages)
+
+            def run():
+                clear_term_stats()  # time the work, not the memo
+                return fn(t)
+            return run, {"words": len(t.split())}
+        return stage
+
+    def classify_stage(pages: int):
+        # Size scales the utterance count: 100 per "page"
+        batch = (UTTERANCES * (pages * 100 // len(UTTERANCES) + 1))[:pages * 100]
+        return (lambda: [classify(u) for u in batch]), {"utterances": len(batch)}
+
+    stages: Dict[str, Stage] = {
+        f"extract{ext}": extract(ext) for ext in WRITERS if extractor_available(ext)
+    }
+    stages.update({
+        "chunk":           chunk,
+        "summarize":       summarizer(local_summarize, text),
+        "key_points":      summarizer(extract_key_points, text),
+        "summarize.wide":  summarizer(local_summarize, wide_text),
+        "key_points.wide": summarizer(extract_key_points, wide_text),
+        "classify":        classify_stage,
+    })
+    return stages
+
+
+def run(stages: Dict[str, Stage], sizes: List[int], repeats: int) -> Dict[str, dict]:
+    results = {}
+    for name, stage in stages.items():
+        for pages in sizes:
+            fn, units = stage(pages)
+            result = measure(fn, repeats)
+            result["throughput"] = {
+                f"{unit}_per_s": round(count / result["median_s"], 1) if result["median_s"] else None
+                for unit, count in units.items()
+            }
+            result["units"] = units
+            key = f"{name}[{pages}p]"
+            results[key] = result
+            rates = "  ".join(f"{v:>12,.0f} {k}" for k, v in result["throughput"].items())
+            print(f"{key:<22} {result['median_s'] * 1000:>10.2f} ms  {result['peak_kib']:>10,.0f} KiB  {rates}")
+    return results
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Baselines
+# ─────────────────────────────────────────────────────────────────────────────
+def save(path: pathlib.Path, results: Dict[str, dict], args: argparse.Namespace):
+    baseline = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "corpus_version": CORPUS_VERSION,
+            "sizes": args.sizes, "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+    print(f"Saved baseline → {path}")
+
+
+def compare(path: pathlib.Path, results: Dict[str, dict], tolerance: float) -> int:
+    """
+    Print time / peak memory ratios against a baseline; count regressions.
+    Time compares the fastest run, which is far less noisy than the median
+    on a busy machine.
+    """
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline["meta"].get("corpus_version") != CORPUS_VERSION:
+        print(f"Note: baseline corpus v{baseline['meta'].get('corpus_version')} != v{CORPUS_VERSION}")
+    print(f"\nvs. {path} ({baseline['meta']['created']}, tolerance {tolerance:.0%})")
+    regressions = 0
+    for key, now in results.items():
+        before = baseline["results"].get(key)
+        if before is None or not before["min_s"]:
+            continue
+        time_ratio = now["min_s"] / before["min_s"]
+        mem_ratio  = now["peak_kib"] / before["peak_kib"] if before["peak_kib"] else 1.0
+        slower     = time_ratio > 1 + tolerance or mem_ratio > 1 + tolerance
+        regressions += slower
+        print(f"{key:<22} time {time_ratio:>6.2f}x  memory {mem_ratio:>6.2f}x  {'REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[5, 20, 80],
+                        help="document sizes in pages (default 5,20,80)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", type=lambda s: s.split(","), default=None,
+                        help="comma-separated stage name prefixes")
+    parser.add_argument("--corpus", type=pathlib.Path,
+                        default=pathlib.Path(tempfile.gettempdir()) / "voice4blind-bench")
+    parser.add_argument("--save", type=pathlib.Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=pathlib.Path, help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slow-down / memory growth counted as a regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    stages = build_stages(args.corpus)
+    if args.only:
+        stages = {n: s for n, s in stages.items() if any(n.startswith(p) for p in args.only)}
+    print(f"{len(stages)} stages × sizes {args.sizes} × {args.repeats} repeats (corpus: {args.corpus})")
+    results = run(stages, args.sizes, args.repeats)
+
+    if args.save:
+        save(args.save, results, args)
+    if args.compare:
+        return 1 if compare(args.compare, results, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,51 +5,66 @@ Handles: file listing, PDF/EPUB/DOCX text extraction,
 """
 
 import os
+import re
 import json
+import uuid
+import hashlib
 import logging
 import asyncio
 import pathlib
-from typing import Optional, List
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException
+import aiofiles
+from fastapi import FastAPI, UploadFile, File, Request, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-# ── Optional heavy deps (graceful fallback) ──────────────────────────────────
-try:
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    logging.warning("PyMuPDF not installed — PDF extraction disabled")
-
-try:
-    from docx import Document as DocxDocument
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-try:
-    import ebooklib
-    from ebooklib import epub
-    from bs4 import BeautifulSoup
-    EPUB_AVAILABLE = True
-except ImportError:
-    EPUB_AVAILABLE = False
-
-try:
-    import openai
-    OPENAI_AVAILABLE = bool(os.environ.get("OPENAI_API_KEY"))
-except ImportError:
-    OPENAI_AVAILABLE = False
+from modules.audiobook import AudiobookStore
+from modules.cache import ExtractionCache, ResultCache, hash_key
+from modules.catalogue import FileCatalogue
+from modules.chunk_index import ChunkIndexStore
+from modules.clients import OpenAIClient, OPENAI_AVAILABLE
+from modules.jobs import FINISHED, JobRegistry
+from modules.metrics import METRICS, REQUEST_PHASES
+from modules.prefetch import TTSPrefetcher
+from modules.search_index import SearchIndex
+from modules.sessions import SessionStore
+from modules.summarizer import DocumentSummarizer
+from modules import tts_engine
+from modules.document_processor import (
+    EXTRACTOR_VERSION, ReadingSession, StreamChunker, count_pages, describe_media_local,
+    extract_key_points, extract_outline, extract_page_range, extractor_available,
+    local_explain, local_summarize,
+)
+from modules.intent_classifier import classify, extract_file_number
+from modules.worker_pool import WorkerPool, PoolBusyError, WorkerCrashedError
 
 # ── App setup ─────────────────────────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("voice4blind")
 
-app = FastAPI(title="VOICE4BLIND API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background so a slow network never delays startup
+    warm_up = asyncio.gather(AI_CLIENT.warm_up(), tts_engine.warm_up())
+    sessions = asyncio.create_task(SESSIONS.run())
+    yield
+    warm_up.cancel()
+    sessions.cancel()  # writes a final snapshot
+    await asyncio.gather(sessions, return_exceptions=True)
+    await AI_CLIENT.close()
+    await JOBS.shutdown()
+    EXTRACT_POOL.shutdown()
+    tts_engine.TTS_POOL.shutdown()
+
+
+app = FastAPI(title="VOICE4BLIND API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -57,13 +72,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Server-Timing header on every response: total plus time per measured
+# phase (extraction pool, synthesis, AI, …). Needs METRICS enabled.
+TIMING_HEADERS = os.environ.get("TIMING_HEADERS", "0") == "1"
+
+
+@app.middleware("http")
+async def record_timing(request: Request, call_next):
+    if not METRICS.enabled:
+        return await call_next(request)
+    phases  = {} if TIMING_HEADERS else None
+    token   = REQUEST_PHASES.set(phases)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        REQUEST_PHASES.reset(token)
+    elapsed = time.perf_counter() - started
+    route   = getattr(request.scope.get("route"), "path", "unmatched")
+    METRICS.observe("http_request_seconds", elapsed, method=request.method, route=route,
+                    status=str(response.status_code))
+    if phases is not None:
+        response.headers["Server-Timing"] = ", ".join(
+            [f"{name};dur={sec * 1000:.1f}" for name, sec in phases.items()]
+            + [f"total;dur={elapsed * 1000:.1f}"])
+    return response
+
 UPLOAD_DIR = pathlib.Path(__file__).parent / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 FRONTEND_DIR = pathlib.Path(__file__).parent.parent / "frontend"
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES   = int(os.environ.get("MAX_UPLOAD_MB", "300")) * 1024 * 1024
+
+def _transient(e: Exception) -> bool:
+    """
+    Worth retrying an ingestion job: a busy extraction pool (503) or a
+    timeout (504). A parser that crashed on the file (also a 503), a
+    missing file and parse errors are final.
+    """
+    if isinstance(e, HTTPException):
+        return e.status_code in (503, 504) and not isinstance(e.__cause__, WorkerCrashedError)
+    return isinstance(e, (PoolBusyError, asyncio.TimeoutError))
+
+
+JOBS = JobRegistry(
+    workers=int(os.environ.get("INGEST_CONCURRENCY", "2")),
+    should_retry=_transient,
+)
+
+CACHE_DIR = pathlib.Path(os.environ.get("CACHE_DIR", pathlib.Path(__file__).parent / "cache"))
+
 # Serve frontend
 if FRONTEND_DIR.exists():
     app.mount("/frontend", StaticFiles(directory=str(FRONTEND_DIR), html=True), name="frontend")
@@ -79,6 +142,13 @@ USERS = {
 ICONS = {".pdf": "📄", ".docx": "📝", ".epub": "📚", ".txt": "📃"}
 TYPE_LABELS = {".pdf": "PDF", ".docx": "Word Document", ".epub": "ePub", ".txt": "Text"}
 
+# Uploads first, then common OS folders (non-invasive read-only scan)
+CATALOGUE = FileCatalogue(
+    [UPLOAD_DIR] + [pathlib.Path.home() / f for f in ["Downloads", "Documents", "Desktop"]],
+    extensions=ICONS,
+    check_interval=float(os.environ.get("CATALOGUE_CHECK_SECONDS", "2")),
+)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ENDPOINTS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -103,78 +173,301 @@ async def login(body: dict):
 
 @app.get("/api/list-files")
 async def list_files():
-    """List files from uploads directory + scan common user folders."""
-    found: List[dict] = []
-
-    # 1. Uploaded files
-    for p in sorted(UPLOAD_DIR.iterdir()):
-        if p.suffix.lower() in ICONS:
-            found.append({
-                "name": p.stem.replace("_", " ").title(),
-                "path": str(p),
-                "type": TYPE_LABELS.get(p.suffix.lower(), p.suffix.upper()),
-                "icon": ICONS.get(p.suffix.lower(), "📄"),
-            })
-
-    # 2. Common OS folders (non-invasive read-only scan)
-    for folder_name in ["Downloads", "Documents", "Desktop"]:
-        folder = pathlib.Path.home() / folder_name
-        if folder.exists():
-            for p in folder.iterdir():
-                if p.suffix.lower() in ICONS:
-                    found.append({
-                        "name": p.stem.replace("_", " ").title(),
-                        "path": str(p),
-                        "type": TYPE_LABELS.get(p.suffix.lower(), p.suffix.upper()),
-                        "icon": ICONS.get(p.suffix.lower(), "📄"),
-                    })
-
-    return {"files": found[:20]}  # cap at 20
+    """List files from uploads directory + common user folders (cached catalogue)."""
+    entries = await asyncio.to_thread(CATALOGUE.entries)
+    found: List[dict] = [
+        {
+            "name": e.title,
+            "path": str(e.path),
+            "type": TYPE_LABELS.get(e.ext, e.ext.upper()),
+            "icon": ICONS.get(e.ext, "📄"),
+        }
+        for e in entries[:20]  # cap at 20
+    ]
+    return {"files": found}
 
 
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
-    """Upload a document file to the server."""
-    suffix = pathlib.Path(file.filename).suffix.lower()
+    """
+    Upload a document file to the server. The body is copied to disk in
+    fixed-size chunks and hashed on the way; extraction runs as a
+    background job (poll /api/jobs/{job_id}).
+    """
+    async def chunks():
+        while True:
+            block = await file.read(UPLOAD_CHUNK_BYTES)
+            if not block:
+                return
+            yield block
+
+    return await store_upload(file.filename or "", chunks())
+
+
+@app.post("/api/upload/stream")
+async def upload_stream(request: Request, filename: str):
+    """Raw-body upload (no multipart), streamed straight from the socket."""
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, f"File too large. The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+    return await store_upload(filename, request.stream())
+
+
+async def store_upload(filename: str, chunks: AsyncIterator[bytes]) -> dict:
+    name   = pathlib.Path(filename).name  # no directory components
+    suffix = pathlib.Path(name).suffix.lower()
     if suffix not in ICONS:
         raise HTTPException(400, "Unsupported file type. Please upload PDF, DOCX, EPUB, or TXT.")
-    dest = UPLOAD_DIR / file.filename
-    content = await file.read()
-    dest.write_bytes(content)
-    text = extract_text(str(dest))
+
+    tmp    = UPLOAD_DIR / f".{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size   = 0
+    try:
+        async with aiofiles.open(tmp, "wb") as out:
+            async for block in chunks:
+                size += len(block)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"File too large. The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+                hasher.update(block)
+                await out.write(block)
+
+        digest = hasher.hexdigest()
+        dest   = await asyncio.to_thread(_find_duplicate_upload, digest, size)
+        duplicate = dest is not None
+        if duplicate:
+            await asyncio.to_thread(tmp.unlink)
+        else:
+            dest = UPLOAD_DIR / name
+            await asyncio.to_thread(os.replace, tmp, dest)
+            await asyncio.to_thread(EXTRACT_CACHE.remember_digest, str(dest), digest)
+    finally:
+        await asyncio.to_thread(tmp.unlink, missing_ok=True)
+    await asyncio.to_thread(CATALOGUE.refresh)
+
+    job = start_ingest(dest)
     return {
         "success": True,
-        "filename": file.filename,
-        "name": pathlib.Path(file.filename).stem.replace("_", " ").title(),
+        "filename": dest.name,
+        "name": dest.stem.replace("_", " ").title(),
+        "doc_id": digest[:16],
+        "duplicate": duplicate,
+        "job_id": job.id,
+    }
+
+
+def _find_duplicate_upload(digest: str, size: int) -> Optional[pathlib.Path]:
+    """An existing upload with the same content (only same-size files are hashed)."""
+    for p in UPLOAD_DIR.iterdir():
+        if p.name.startswith(".") or p.suffix.lower() not in ICONS:
+            continue
+        try:
+            if p.stat().st_size == size and EXTRACT_CACHE.digest(str(p)) == digest:
+                return p
+        except OSError:
+            continue
+    return None
+
+
+def start_ingest(path: pathlib.Path):
+    try:
+        return JOBS.start("ingest", lambda job: ingest_document(str(path), job), label=path.name)
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
+
+
+async def ingest_document(path: str, job=None) -> dict:
+    def progress(done: int, total: int):
+        if job is not None:
+            # Leave the last 10% for outline / search indexing
+            job.report(90.0 * done / max(total, 1), f"Processed {done} of {total} pages")
+
+    text   = await extract_text_async(path, on_progress=progress)
+    doc_id = await asyncio.to_thread(EXTRACT_CACHE.document_id, path)
+    index  = CHUNK_INDEX.get(doc_id)
+    return {
+        "doc_id": doc_id,
+        "filename": pathlib.Path(path).name,
+        "total_chunks": len(index) if index else 0,
         "text_preview": text[:300],
     }
 
 
+@app.post("/api/ingest")
+async def ingest(name: str):
+    """Queue extraction + indexing of a catalogue file; poll or watch the job."""
+    path = await asyncio.to_thread(find_document, name)
+    return start_ingest(path).to_dict()
+
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 50):
+    return {"jobs": [j.to_dict() for j in JOBS.list(limit)], **JOBS.stats()}
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown job")
+    return job.to_dict()
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    if JOBS.get(job_id) is None:
+        raise HTTPException(404, "Unknown job")
+    return {"cancelled": JOBS.cancel(job_id)}
+
+
 @app.get("/api/read-file")
 async def read_file(name: str):
     """Extract full text from a named file."""
-    # Search uploads + home folders
-    candidates = list(UPLOAD_DIR.glob("*"))
-    for folder_name in ["Downloads", "Documents", "Desktop"]:
-        folder = pathlib.Path.home() / folder_name
-        if folder.exists():
-            candidates += list(folder.iterdir())
-
-    match = None
-    name_lower = name.lower().replace(" ", "")
-    for p in candidates:
-        if p.suffix.lower() in ICONS:
-            if p.stem.lower().replace("_", "").replace(" ", "") == name_lower:
-                match = p
-                break
-            if name_lower in p.stem.lower().replace("_", "").replace(" ", ""):
-                match = p
-
-    if not match:
+    match = await asyncio.to_thread(find_document, name)
+    text = await extract_text_async(str(match))
+    doc_id = await asyncio.to_thread(EXTRACT_CACHE.document_id, str(match))
+    index  = CHUNK_INDEX.get(doc_id)
+    return {
+        "text": text, "filename": match.name, "doc_id": doc_id,
+        "total_chunks": len(index) if index else 0,
+    }
+
+
+@app.get("/api/read-file/stream")
+async def read_file_stream(name: str, words: int = 80):
+    """
+    Stream a document as NDJSON, one line per batch of speakable chunks,
+    so reading can start as soon as the first page is parsed.
+    """
+    match = await asyncio.to_thread(find_document, name)
+
+    async def lines():
+        async for event in stream_document(str(match), words):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def find_document(name: str) -> pathlib.Path:
+    """Resolve a spoken file name against the file catalogue."""
+    entry = CATALOGUE.resolve(name)
+    if entry is None or not entry.path.exists():
+        # Folder changed since the last throttled check
+        CATALOGUE.refresh(force=entry is not None)
+        entry = CATALOGUE.resolve(name)
+    if entry is None:
         raise HTTPException(404, f"File not found: {name}")
+    return entry.path
+
+
+@app.get("/api/documents/{doc_id}/chunks")
+async def document_chunks(doc_id: str, start: int = 0, count: int = 20):
+    """A window of the server-side chunk index (max 200 chunks per call)."""
+    index = CHUNK_INDEX.get(doc_id)
+    if index is None:
+        raise HTTPException(404, "Document not indexed yet. Open it first.")
+    chunks = await asyncio.to_thread(index.window, start, min(count, 200))
+    return {"doc_id": doc_id, "total": len(index), "start": start, "chunks": chunks}
+
+
+@app.get("/api/documents/{doc_id}/outline")
+async def document_outline(doc_id: str):
+    """Chapter/section outline with the chunk each entry starts at."""
+    return {"doc_id": doc_id, "entries": _outline(doc_id).entries}
+
+
+@app.get("/api/documents/{doc_id}/outline/find")
+async def document_outline_find(doc_id: str, q: str):
+    """Resolve a spoken chapter name ("chapter three") to an outline entry."""
+    entry = _outline(doc_id).find(q)
+    if entry is None:
+        raise HTTPException(404, f"No chapter matching: {q}")
+    return entry
+
+
+@app.get("/api/documents/{doc_id}/outline/next")
+async def document_outline_next(doc_id: str, chunk: int):
+    entry = _outline(doc_id).next_after(chunk)
+    if entry is None:
+        raise HTTPException(404, "This is the last chapter.")
+    return entry
+
 
-    text = extract_text(str(match))
-    return {"text": text, "filename": match.name}
+@app.get("/api/documents/{doc_id}/outline/prev")
+async def document_outline_prev(doc_id: str, chunk: int):
+    entry = _outline(doc_id).previous_before(chunk)
+    if entry is None:
+        raise HTTPException(404, "This is the first chapter.")
+    return entry
+
+
+def _outline(doc_id: str):
+    index = CHUNK_INDEX.get(doc_id)
+    if index is None:
+        raise HTTPException(404, "Document not indexed yet. Open it first.")
+    return index.outline
+
+
+@app.get("/api/search")
+async def search(q: str, limit: int = 10):
+    """Ranked chunk hits across every indexed document."""
+    hits = await asyncio.to_thread(SEARCH_INDEX.search, q, min(limit, 50))
+    for hit in hits:
+        index = CHUNK_INDEX.get(hit["doc_id"])
+        if index is not None and hit["chunk"] < len(index):
+            hit["page"] = index.pages[hit["chunk"]]
+            hit["text"] = index[hit["chunk"]]
+    return {"query": q, "hits": hits}
+
+
+@app.get("/api/cache-stats")
+async def cache_stats():
+    """Hit/miss counters for the extraction cache, plus pool load."""
+    return {
+        "extraction":   EXTRACT_CACHE.stats(),
+        "tts_audio":    tts_engine.cache_stats(),
+        "extract_pool": EXTRACT_POOL.stats(),
+        "tts_pool":     tts_engine.TTS_POOL.stats(),
+        "openai":       AI_CLIENT.stats(),
+        "ai_results":   AI_RESULTS.stats(),
+        "search":       SEARCH_INDEX.stats(),
+        "catalogue":    CATALOGUE.stats(),
+        "jobs":         JOBS.stats(),
+        "sessions":     SESSIONS.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Timings, counters, queue depths and cache hit ratios in Prometheus text format."""
+    return Response(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _hit_ratios() -> list:
+    ai = AI_RESULTS.stats()
+    ai_lookups = ai["hits"] + ai["misses"]
+    return [
+        ({"cache": "extraction"}, EXTRACT_CACHE.stats()["hit_ratio"]),
+        ({"cache": "tts_audio"},  tts_engine.cache_stats()["hit_ratio"]),
+        ({"cache": "ai_results"}, ai["hits"] / ai_lookups if ai_lookups else 0.0),
+    ]
+
+
+METRICS.gauge("cache_hit_ratio", _hit_ratios, "Hits / lookups since start")
+METRICS.gauge("pool_pending", lambda: [({"pool": p.name}, p.depth) for p in (EXTRACT_POOL, tts_engine.TTS_POOL)],
+              "Jobs queued or running in a worker pool")
+METRICS.gauge("jobs_queued", lambda: JOBS.depth, "Background jobs waiting for a worker")
+METRICS.gauge("jobs_running", lambda: JOBS.stats()["running"], "Background jobs in progress")
+METRICS.gauge("ws_connections", lambda: len(WS_CLIENTS), "Open /ws connections")
+METRICS.gauge("ws_tasks", lambda: sum(len(c.tasks) for c in WS_CLIENTS), "/ws requests in flight")
+METRICS.gauge("reading_sessions", lambda: SESSIONS.stats()["live"], "Reading sessions held in memory")
+METRICS.describe("pdf_page_seconds", "Text + image scan of one PDF page")
+METRICS.describe("pdf_find_tables_seconds", "Table detection on one PDF page")
+METRICS.describe("tts_synthesize_seconds", "Uncached synthesis per backend")
+METRICS.describe("ai_seconds", "AI answer latency, cache hits included")
+METRICS.describe("ws_message_seconds", "/ws message handling, queueing included")
+METRICS.describe("pool_job_seconds", "Worker pool job as seen by the caller, queueing included")
+METRICS.describe("http_request_seconds", "HTTP request until response headers")
+METRICS.describe("extraction_waits_total", "Opens that waited for the same document's running extraction")
 
 
 class SummarizeRequest(BaseModel):
@@ -188,6 +481,34 @@ async def summarize(req: SummarizeRequest):
     return {"summary": summary}
 
 
+class DocumentSummaryRequest(BaseModel):
+    language: Optional[str] = "en"
+    chapter: Optional[str] = None   # spoken chapter name, e.g. "chapter three"
+    start: int = 0                  # chunk range, used when no chapter is given
+    stop: Optional[int] = None
+
+@app.post("/api/documents/{doc_id}/summarize")
+async def summarize_document(doc_id: str, req: DocumentSummaryRequest):
+    """Summary of a whole document, a chapter or a chunk range (map-reduce)."""
+    index = CHUNK_INDEX.get(doc_id)
+    if index is None:
+        raise HTTPException(404, "Document not indexed yet. Open it first.")
+    start, stop, title = _chunk_range(index, req.chapter, req.start, req.stop)
+    result = await DOC_SUMMARIZER.summarize_range(index, start, stop, req.language)
+    return {"doc_id": doc_id, "chapter": title, "start": start, "stop": stop, **result}
+
+
+def _chunk_range(index, chapter: Optional[str], start: int, stop: Optional[int]) -> Tuple[int, int, Optional[str]]:
+    """(start, stop, chapter title) of a spoken chapter name, else of the given range."""
+    if not chapter:
+        return max(start, 0), min(stop if stop is not None else len(index), len(index)), None
+    entry = index.outline.find(chapter)
+    if entry is None:
+        raise HTTPException(404, f"No chapter matching: {chapter}")
+    following = index.outline.next_after(entry["chunk"], max_level=entry["level"])
+    return entry["chunk"], following["chunk"] if following else len(index), entry["title"]
+
+
 @app.post("/api/describe-image")
 async def describe_image(body: dict):
     """Describe an image/graph from text context."""
@@ -196,131 +517,948 @@ async def describe_image(body: dict):
     return {"description": desc}
 
 
+TTS_MAX_CHARS = 5000
+TTS_PREFETCH_AHEAD = int(os.environ.get("TTS_PREFETCH_AHEAD", "3"))
+
+class TTSRequest(BaseModel):
+    text: str
+    language: Optional[str] = "en-US"
+    rate: Optional[float] = 1.0
+
+@app.post("/api/tts")
+async def tts(req: TTSRequest):
+    """
+    Synthesize speech. 204 means no server voice is available and the
+    client should fall back to browser speech.
+    """
+    audio = await synthesize_speech(req.text, req.language, req.rate)
+    if not audio:
+        return Response(status_code=204)
+    return Response(content=audio, media_type=tts_engine.audio_mime(audio))
+
+
+async def synthesize_speech(text: str, language: str = "en-US", rate: float = 1.0) -> Optional[bytes]:
+    if len(text) > TTS_MAX_CHARS:
+        raise HTTPException(413, f"Text too long to speak at once (max {TTS_MAX_CHARS} characters).")
+    try:
+        return await tts_engine.synthesize_async(text, language, rate)
+    except PoolBusyError:
+        raise HTTPException(503, "Speech synthesis is busy. Please try again shortly.")
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Speech synthesis took too long.")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# AUDIOBOOKS — pre-rendered documents / chapters, served with Range support
+# ─────────────────────────────────────────────────────────────────────────────
+AUDIOBOOKS = AudiobookStore(
+    CACHE_DIR / "audiobooks",
+    synth=tts_engine.synthesize_async,
+    concurrency=int(os.environ.get("AUDIOBOOK_CONCURRENCY", "4")),
+)
+AUDIOBOOK_READ_BYTES = 256 * 1024
+_audiobook_jobs: Dict[str, str] = {}   # book_id → rendering job id
+
+
+class AudiobookRequest(BaseModel):
+    language: Optional[str] = "en-US"
+    rate: Optional[float] = 1.0
+    chapter: Optional[str] = None   # spoken chapter name, e.g. "chapter three"
+    start: int = 0                  # chunk range, used when no chapter is given
+    stop: Optional[int] = None
+
+@app.post("/api/documents/{doc_id}/audiobook")
+async def render_audiobook(doc_id: str, req: AudiobookRequest):
+    """
+    Render a document, chapter or chunk range to one audio file. Answers
+    at once with the book when it exists, else with the rendering job
+    (watch it over /ws or poll /api/jobs/{job_id}).
+    """
+    index = CHUNK_INDEX.get(doc_id)
+    if index is None:
+        raise HTTPException(404, "Document not indexed yet. Open it first.")
+    voice = tts_engine.voice_for(req.language)
+    if not voice:
+        raise HTTPException(503, "No server voice is available to render audio.")
+    start, stop, title = _chunk_range(index, req.chapter, req.start, req.stop)
+    if start >= stop:
+        raise HTTPException(400, "That range has no text to read.")
+
+    book_id = AUDIOBOOKS.book_id(index, start, stop, req.language, req.rate, voice)
+    book    = await asyncio.to_thread(AUDIOBOOKS.get, book_id)
+    if book is not None:
+        return {"book_id": book_id, "ready": True, "chapter": title, "audio_url": _audiobook_url(book_id)}
+
+    job = JOBS.get(_audiobook_jobs.get(book_id, ""))
+    if job is None or job.status in ("failed", "cancelled"):
+        async def work(job):
+            book = await AUDIOBOOKS.render(
+                index, start, stop, req.language, req.rate, voice,
+                on_progress=lambda done, total: job.report(100.0 * done / total, f"Rendered {done} of {total} chunks"),
+            )
+            return {"book_id": book["id"], "duration": book["duration"], "audio_url": _audiobook_url(book["id"])}
+        try:
+            job = JOBS.start("audiobook", work, label=f"{index.filename} {title or f'{start}-{stop}'}")
+        except RuntimeError as e:
+            raise HTTPException(503, str(e))
+        _audiobook_jobs[book_id] = job.id
+
+        def forget(job):
+            # Done: the book is on disk from now on. Failed or cancelled:
+            # the next request starts a fresh job.
+            if job.status in FINISHED and _audiobook_jobs.get(book_id) == job.id:
+                del _audiobook_jobs[book_id]
+        JOBS.subscribe(forget, job.id)
+    return {"book_id": book_id, "ready": False, "chapter": title, "job": job.to_dict()}
+
+
+def _audiobook_url(book_id: str) -> str:
+    return f"/api/audiobooks/{book_id}/audio"
+
+
+@app.get("/api/audiobooks/{book_id}")
+async def audiobook_index(book_id: str):
+    """Chunk → time / byte offset index of a rendered book."""
+    book = await asyncio.to_thread(AUDIOBOOKS.get, book_id)
+    if book is None:
+        raise HTTPException(404, "No such audiobook (it may still be rendering).")
+    return {**book, "audio_url": _audiobook_url(book_id)}
+
+
+@app.get("/api/audiobooks/{book_id}/audio")
+async def audiobook_audio(book_id: str, request: Request, download: bool = False):
+    """The book's audio, honouring single HTTP Range requests for seeking."""
+    book = await asyncio.to_thread(AUDIOBOOKS.get, book_id)
+    if book is None:
+        raise HTTPException(404, "No such audiobook (it may still be rendering).")
+    size    = book["bytes"]
+    headers = {"Accept-Ranges": "bytes"}
+    if download:
+        name = pathlib.Path(book["title"] or book_id).stem + pathlib.Path(book["file"]).suffix
+        headers["Content-Disposition"] = _attachment(name)
+
+    span = _byte_range(request.headers.get("range"), size)
+    if span is None:
+        start, end, status = 0, size - 1, 200
+    elif span == (-1, -1):
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    else:
+        (start, end), status = span, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_read_span(AUDIOBOOKS.audio_path(book), start, end),
+                             status_code=status, media_type=book["mime"], headers=headers)
+
+
+def _attachment(filename: str) -> str:
+    """
+    Content-Disposition for a download (RFC 6266): an ASCII filename for
+    old clients plus the exact UTF-8 name in filename*.
+    """
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{urllib.parse.quote(filename, safe='')}"
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single "bytes=" range; None to send the
+    whole file (no header, or one we don't serve partially, such as a
+    multi-range); (-1, -1) when unsatisfiable.
+    """
+    m = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', header or "")
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if not m.group(1):   # suffix: the last n bytes
+        n = int(m.group(2))
+        return (max(size - n, 0), size - 1) if n and size else (-1, -1)
+    start = int(m.group(1))
+    if m.group(2) and int(m.group(2)) < start:
+        return None   # malformed: ignored, like a missing header
+    end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    return (start, end) if start <= end else (-1, -1)
+
+
+async def _read_span(path: pathlib.Path, start: int, end: int) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        left = end - start + 1
+        while left > 0:
+            block = await f.read(min(AUDIOBOOK_READ_BYTES, left))
+            if not block:
+                return
+            left -= len(block)
+            yield block
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # WEBSOCKET — Real-time voice pipeline
 # ─────────────────────────────────────────────────────────────────────────────
+# Every message may carry a request_id, echoed on each reply it causes.
+# Quick actions are answered inline; the rest run as tracked tasks so a
+# ping or "stop" is never stuck behind a slow summary or synthesis.
+# Actions that move the reader (WS_ORDERED) run one at a time in arrival
+# order, outside the WS_MAX_CONCURRENT slots.
+WS_MAX_CONCURRENT = int(os.environ.get("WS_MAX_CONCURRENT", "4"))
+WS_MAX_PENDING    = int(os.environ.get("WS_MAX_PENDING", "16"))
+WS_CLIENTS: set = set()   # open WsConnections, for metrics
+
+
+class WsConnection:
+    """One client socket: serialized sends, in-flight tasks, command state."""
+
+    def __init__(self, ws: WebSocket):
+        self.ws         = ws
+        self.prefetcher = TTSPrefetcher(tts_engine.synthesize_async, ahead=TTS_PREFETCH_AHEAD)
+        self.voice      = VoiceState(self.prefetcher)
+        self.tasks: Dict[str, Tuple[str, asyncio.Task]] = {}   # request_id → (action, task)
+        self.pushes: set = set()
+        self.slots = asyncio.Semaphore(WS_MAX_CONCURRENT)
+        self.order = asyncio.Lock()   # FIFO: waiters are woken in arrival order
+        self._send_lock = asyncio.Lock()
+        # Held for a whole JSON header + binary frame(s) sequence, so audio
+        # from two requests never interleaves
+        self.audio_lock = asyncio.Lock()
+        self._seq = 0
+
+    async def send(self, payload: dict, request_id: Optional[str] = None):
+        if request_id is not None:
+            payload = {**payload, "request_id": request_id}
+        async with self._send_lock:
+            await self.ws.send_json(payload)
+
+    async def send_bytes(self, data: bytes):
+        async with self._send_lock:
+            await self.ws.send_bytes(data)
+
+    def push_job(self, job):
+        task = asyncio.create_task(self.send({"type": "job_progress", "data": job.to_dict()}))
+        self.pushes.add(task)
+        task.add_done_callback(self.pushes.discard)
+
+    # ── Task tracking ────────────────────────────────────────────────────────
+    def spawn(self, action: str, handler, msg: dict, request_id: Optional[str]):
+        if len(self.tasks) >= WS_MAX_PENDING:
+            return asyncio.create_task(
+                self.send({"type": "error", "data": "Too many requests in flight."}, request_id))
+        if msg.get("supersede"):
+            self.cancel(actions={action})
+        self._seq += 1
+        key  = request_id or f"_{self._seq}"
+        task = asyncio.create_task(self._run(action, handler, msg, request_id))
+        self.tasks[key] = (action, task)
+        task.add_done_callback(lambda t: self._forget(key, t))
+
+    def _forget(self, key: str, task: asyncio.Task):
+        # A reused request_id may already point at a newer task
+        if self.tasks.get(key, (None, None))[1] is task:
+            del self.tasks[key]
+
+    async def _run(self, action: str, handler, msg: dict, request_id: Optional[str]):
+        try:
+            with METRICS.timer("ws_message_seconds", action=action):
+                async with self.order if action in WS_ORDERED else self.slots:
+                    await handler(self, msg, request_id)
+        except asyncio.CancelledError:
+            try:
+                await self.send({"type": "cancelled", "action": action}, request_id)
+            except Exception:
+                pass  # socket already gone
+            raise
+        except HTTPException as e:
+            await self.send({"type": "error", "data": e.detail}, request_id)
+        except Exception as e:
+            logger.error(f"/ws {action} failed: {e}")
+            try:
+                await self.send({"type": "error", "data": f"{action} failed."}, request_id)
+            except Exception:
+                pass
+
+    def cancel(self, request_id: Optional[str] = None, actions: Optional[set] = None) -> int:
+        """Cancel one request, or every in-flight request of the given actions."""
+        victims = [
+            task for key, (action, task) in self.tasks.items()
+            if (request_id is not None and key == request_id) or (actions and action in actions)
+        ]
+        for task in victims:
+            task.cancel()
+        return len(victims)
+
+    def close(self):
+        for _, task in list(self.tasks.values()):
+            task.cancel()
+        JOBS.unsubscribe(self.push_job)
+        self.voice.close()
+
+
+# ── Handlers: async (conn, msg, request_id) ──────────────────────────────────
+async def _ws_summarize(conn: WsConnection, msg: dict, rid: Optional[str]):
+    summary = await ai_summarize(msg.get("text", ""), msg.get("language", "en"))
+    await conn.send({"type": "summary", "data": summary}, rid)
+
+
+async def _ws_describe_media(conn: WsConnection, msg: dict, rid: Optional[str]):
+    desc = await ai_describe_image(msg.get("context", ""))
+    await conn.send({"type": "media_description", "data": desc}, rid)
+
+
+async def _ws_detect_language(conn: WsConnection, msg: dict, rid: Optional[str]):
+    await conn.send({"type": "language", "data": detect_language_hint(msg.get("text", ""))}, rid)
+
+
+async def _ws_read_stream(conn: WsConnection, msg: dict, rid: Optional[str]):
+    path = await asyncio.to_thread(find_document, msg.get("name", ""))
+    async for event in stream_document(str(path), int(msg.get("words", 80))):
+        await conn.send({**event, "type": f"document_{event['type']}"}, rid)
+
+
+async def _ws_ingest(conn: WsConnection, msg: dict, rid: Optional[str]):
+    path = await asyncio.to_thread(find_document, msg.get("name", ""))
+    job  = start_ingest(path)
+    JOBS.subscribe(conn.push_job, job.id)
+    conn.push_job(job)
+
+
+async def _ws_watch_job(conn: WsConnection, msg: dict, rid: Optional[str]):
+    job = JOBS.get(msg.get("job_id", ""))
+    if job is None:
+        await conn.send({"type": "error", "data": "Unknown job"}, rid)
+        return
+    JOBS.subscribe(conn.push_job, job.id)
+    conn.push_job(job)
+
+
+async def _ws_cancel_job(conn: WsConnection, msg: dict, rid: Optional[str]):
+    JOBS.cancel(msg.get("job_id", ""))
+
+
+async def _ws_tts(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # JSON header, then the audio as one binary frame
+    audio = await synthesize_speech(msg.get("text", ""), msg.get("language", "en-US"),
+                                    float(msg.get("rate", 1.0)))
+    if not audio:
+        await conn.send({"type": "audio", "data": None}, rid)
+        return
+    async with conn.audio_lock:
+        await conn.send({"type": "audio", "mime": tts_engine.audio_mime(audio), "bytes": len(audio)}, rid)
+        await conn.send_bytes(audio)
+
+
+async def _ws_tts_stream(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # audio_stream_start, binary frames as produced, audio_stream_end
+    text = msg.get("text", "")
+    if len(text) > TTS_MAX_CHARS:
+        await conn.send({"type": "error", "data": "Text too long to speak at once."}, rid)
+        return
+    frames = total = 0
+    async with conn.audio_lock:
+        try:
+            async for mime, standalone, data in tts_engine.synthesize_stream_async(
+                    text, msg.get("language", "en-US"), float(msg.get("rate", 1.0))):
+                if not frames:
+                    await conn.send({"type": "audio_stream_start", "mime": mime,
+                                     "framing": "segments" if standalone else "stream"}, rid)
+                await conn.send_bytes(data)
+                frames += 1
+                total  += len(data)
+        except (PoolBusyError, asyncio.TimeoutError):
+            logger.warning("Streaming TTS unavailable (busy or timed out)")
+        finally:
+            # frames == 0 → no server voice; client speaks with the browser.
+            # Also sent on cancel so the client knows the stream is over.
+            await asyncio.shield(conn.send(
+                {"type": "audio_stream_end", "frames": frames, "bytes": total}, rid))
+
+
+async def _ws_play(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # Chunk text + audio from the server-side index; the next
+    # TTS_PREFETCH_AHEAD chunks are synthesized in the background.
+    doc_id = msg.get("doc_id", "")
+    index  = CHUNK_INDEX.get(doc_id)
+    pos    = int(msg.get("index", 0))
+    if index is None or not 0 <= pos < len(index):
+        await conn.send({"type": "error", "data": "No such document position."}, rid)
+        return
+    lang = msg.get("language", "en-US")
+    rate = float(msg.get("rate", 1.0))
+    chunk = (await asyncio.to_thread(index.window, pos, 1))[0]
+    conn.prefetcher.update(doc_id, index, pos, lang, rate)
+    if conn.voice.user:
+        await asyncio.to_thread(SESSIONS.update, conn.voice.user, doc_id, index=pos, rate=rate, language=lang)
+    try:
+        audio = await conn.prefetcher.audio_for(doc_id, pos, chunk["text"], lang, rate)
+    except (PoolBusyError, asyncio.TimeoutError):
+        audio = None  # client falls back to browser speech
+    async with conn.audio_lock:
+        await conn.send({
+            "type": "chunk", "doc_id": doc_id, "total": len(index), **chunk,
+            "mime": tts_engine.audio_mime(audio) if audio else None,
+            "bytes": len(audio) if audio else 0,
+        }, rid)
+        if audio:
+            await conn.send_bytes(audio)
+
+
+async def _ws_resume(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # {"user", "doc_id"?} → the saved position (most recent book without
+    # doc_id) and its chunk, with look-ahead audio already under way
+    voice = conn.voice
+    if not voice.user:
+        await conn.send({"type": "error", "data": "Say who you are before resuming."}, rid)
+        return
+    doc_id = msg.get("doc_id")
+    saved  = await asyncio.to_thread(SESSIONS.get, voice.user, doc_id) if doc_id \
+        else await asyncio.to_thread(SESSIONS.latest, voice.user)
+    index  = CHUNK_INDEX.get(saved.doc_id) if saved else None
+    if index is None or not len(index):
+        await conn.send({"type": "resumed", "doc_id": doc_id, "found": False}, rid)
+        return
+    session = voice.session = ReadingSession(index, outline=index.outline, doc_id=saved.doc_id)
+    await voice.restore(session)
+    conn.prefetcher.update(session.doc_id, index, session.index, session.language, session.rate)
+    chunk = (await asyncio.to_thread(index.window, session.index, 1))[0]
+    await conn.send({
+        "type": "resumed", "found": True, "doc_id": session.doc_id, "title": index.filename,
+        "position": session.index, "total": len(index), "rate": session.rate,
+        "pitch": session.pitch, "language": session.language, "bookmarks": saved.bookmarks,
+        "chunk": chunk,
+    }, rid)
+
+
+async def _ws_bookmark(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # Marks the current position (or msg["index"]) in the open document
+    voice, session = conn.voice, conn.voice.session
+    if not voice.user or session is None:
+        await conn.send({"type": "error", "data": "Open a document before adding a bookmark."}, rid)
+        return
+    pos   = int(msg.get("index", session.index))
+    saved = await asyncio.to_thread(SESSIONS.add_bookmark, voice.user, session.doc_id, pos,
+                                    str(msg.get("label", ""))[:100])
+    await conn.send({"type": "bookmarks", "doc_id": session.doc_id, "bookmarks": saved.bookmarks}, rid)
+
+
+# Work a spoken "stop" / "pause" makes pointless
+_SUPERSEDED_BY_PAUSE = {"summarize", "describe_media", "tts", "tts_stream", "play"}
+
+
+async def _ws_command(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # Transcript in, intent + next chunk + media descriptions out
+    # A "stop" has already cancelled playback in websocket_endpoint
+    reply = await run_command(conn.voice, msg.get("transcript", ""), msg.get("doc_id"))
+    await conn.send({"type": "command_result", **reply}, rid)
+
+
+async def _ws_cancel(conn: WsConnection, msg: dict, rid: Optional[str]):
+    # {"target": id} (or just the request_id) cancels one request;
+    # {"actions": [...]} cancels every in-flight request of those kinds
+    target = msg.get("target") or (None if msg.get("actions") else rid)
+    n = conn.cancel(target, set(msg.get("actions") or ()))
+    await conn.send({"type": "cancel_result", "cancelled": n}, rid)
+
+
+async def _ws_ping(conn: WsConnection, msg: dict, rid: Optional[str]):
+    await conn.send({"type": "pong"}, rid)
+
+
+WS_HANDLERS = {
+    "summarize":       _ws_summarize,
+    "describe_media":  _ws_describe_media,
+    "detect_language": _ws_detect_language,
+    "read_stream":     _ws_read_stream,
+    "ingest":          _ws_ingest,
+    "watch_job":       _ws_watch_job,
+    "cancel_job":      _ws_cancel_job,
+    "tts":             _ws_tts,
+    "tts_stream":      _ws_tts_stream,
+    "play":            _ws_play,
+    "command":         _ws_command,
+    "resume":          _ws_resume,
+    "bookmark":        _ws_bookmark,
+    "cancel":          _ws_cancel,
+    "ping":            _ws_ping,
+}
+
+# Cheap and order-sensitive: handled inline, never queued behind slow work
+WS_INLINE = {"ping", "cancel", "cancel_job", "detect_language", "watch_job"}
+# Change the shared VoiceState / reading position: queued in arrival order
+WS_ORDERED = {"command", "resume", "bookmark", "play"}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     await ws.accept()
     logger.info("WebSocket client connected")
+    conn = WsConnection(ws)
+    WS_CLIENTS.add(conn)
     try:
         while True:
             data = await ws.receive_text()
-            msg  = json.loads(data)
-            action = msg.get("action")
+            try:
+                msg = json.loads(data)
+            except ValueError:
+                await conn.send({"type": "error", "data": "Invalid JSON"})
+                continue
+            action  = msg.get("action")
+            rid     = msg.get("request_id")
+            handler = WS_HANDLERS.get(action)
+            if handler is None:
+                continue
+            if msg.get("user"):
+                conn.voice.user = str(msg["user"]).lower().strip()
+            if action in WS_INLINE:
+                with METRICS.timer("ws_message_seconds", action=action):
+                    await handler(conn, msg, rid)
+            else:
+                if action == "command" and classify(msg.get("transcript", "")).name == "pause":
+                    # Before queueing, so a "stop" can never wait behind what it stops
+                    conn.cancel(actions=_SUPERSEDED_BY_PAUSE)
+                conn.spawn(action, handler, msg, rid)
 
-            if action == "summarize":
-                text    = msg.get("text", "")
-                lang    = msg.get("language", "en")
-                summary = await ai_summarize(text, lang)
-                await ws.send_json({"type": "summary", "data": summary})
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
+    finally:
+        WS_CLIENTS.discard(conn)
+        conn.close()
 
-            elif action == "describe_media":
-                context = msg.get("context", "")
-                desc    = await ai_describe_image(context)
-                await ws.send_json({"type": "media_description", "data": desc})
 
-            elif action == "detect_language":
-                text = msg.get("text", "")
-                lang = detect_language_hint(text)
-                await ws.send_json({"type": "language", "data": lang})
+# ─────────────────────────────────────────────────────────────────────────────
+# VOICE COMMANDS — transcript → intent → server-held ReadingSession
+# ─────────────────────────────────────────────────────────────────────────────
+SPOKEN_LANGUAGES = {
+    "english": "en-US", "hindi": "hi-IN", "kannada": "kn-IN", "tamil": "ta-IN",
+    "telugu": "te-IN", "malayalam": "ml-IN", "marathi": "mr-IN", "bengali": "bn-IN",
+    "gujarati": "gu-IN", "punjabi": "pa-IN", "urdu": "ur-PK", "odia": "or-IN",
+    "assamese": "as-IN",
+}
 
-            elif action == "ping":
-                await ws.send_json({"type": "pong"})
+RATE_STEP, MIN_RATE, MAX_RATE = 0.25, 0.5, 2.0
+VOLUME_STEP = 0.1
+
+_CHAPTER_RE = re.compile(r'\b(?:chapter|section|unit|lesson|part)\b', re.I)
+_NAMED_CHAPTER_RE = re.compile(r'\b(?:chapter|section|unit|lesson|part)\s+(?!this\b|that\b)\w', re.I)
+_GOTO_RE    = re.compile(r'^.*?\b(?:go to|goto|jump to|open|read|take me to)\s+', re.I)
+
+# Intents whose reply carries the chunk now under the cursor
+_READING_INTENTS = {"start_read", "resume", "next", "prev", "repeat", "open_file", "jump_chapter"}
+
+# Position / voice settings per user + document, surviving reconnects
+SESSIONS = SessionStore(
+    CACHE_DIR / "sessions",
+    idle_seconds=float(os.environ.get("SESSION_IDLE_SECONDS", "1800")),
+    snapshot_seconds=float(os.environ.get("SESSION_SNAPSHOT_SECONDS", "30")),
+)
+
+
+class VoiceState:
+    """Per-connection command state: the reading session and look-ahead work."""
+
+    def __init__(self, prefetcher: TTSPrefetcher):
+        self.session: Optional[ReadingSession] = None
+        self.user: Optional[str] = None   # set by any message carrying "user"
+        self.prefetcher = prefetcher
+        self.media: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    async def restore(self, session: ReadingSession):
+        """Put a freshly opened session back where this user left it."""
+        if not self.user:
+            return
+        saved = await asyncio.to_thread(SESSIONS.get, self.user, session.doc_id)
+        if saved is not None:
+            session.index    = min(saved.index, max(len(session.chunks) - 1, 0))
+            session.rate     = saved.rate
+            session.pitch    = saved.pitch
+            session.language = saved.language
+
+    async def remember(self):
+        # update() may first read the snapshot from disk
+        session = self.session
+        if self.user and session is not None and session.doc_id:
+            await asyncio.to_thread(SESSIONS.update, self.user, session.doc_id, index=session.index,
+                                    rate=session.rate, pitch=session.pitch, language=session.language)
+
+    def close(self):
+        self.prefetcher.cancel()
+        for task in self.media.values():
+            task.cancel()
+        self.media.clear()
 
-    except WebSocketDisconnect:
-        logger.info("WebSocket client disconnected")
+
+async def open_reading_session(path: pathlib.Path) -> ReadingSession:
+    """ReadingSession over the document's chunk index, extracting it first if needed."""
+    doc_id = await asyncio.to_thread(EXTRACT_CACHE.document_id, str(path))
+    index  = CHUNK_INDEX.get(doc_id)
+    if index is None:
+        await extract_text_async(str(path))
+        index = CHUNK_INDEX.get(doc_id)
+    if index is None or not len(index):
+        raise HTTPException(422, f"No readable text in {path.name}.")
+    return ReadingSession(index, outline=index.outline, doc_id=doc_id)
+
+
+async def describe_chunk(doc_id: str, i: int) -> str:
+    index = CHUNK_INDEX.get(doc_id)
+    text  = await asyncio.to_thread(index.__getitem__, i)
+    if OPENAI_AVAILABLE:
+        return await ai_describe_image(text)
+    return describe_media_local(index.media[i], text)
+
+
+def _media_task(state: VoiceState, doc_id: str, i: int) -> asyncio.Task:
+    task = state.media.get((doc_id, i))
+    if task is None:
+        task = state.media[(doc_id, i)] = asyncio.create_task(describe_chunk(doc_id, i))
+    return task
+
+
+async def _media_descriptions(state: VoiceState, session: ReadingSession) -> Dict[int, str]:
+    """
+    Description of the current chunk if it is a figure/table (awaited), plus
+    any upcoming ones whose background description has already finished.
+    """
+    index = session.chunks
+    pos   = session.index
+    ahead = range(pos, min(pos + 1 + TTS_PREFETCH_AHEAD, len(index)))
+    for key in [k for k in state.media if k[0] != session.doc_id or k[1] not in ahead]:
+        state.media.pop(key).cancel()
+    tasks = {i: _media_task(state, session.doc_id, i) for i in ahead if index.media[i]}
+    if pos in tasks:
+        await asyncio.wait([tasks[pos]])
+    return {
+        i: task.result() for i, task in tasks.items()
+        if task.done() and not task.cancelled() and task.exception() is None
+    }
+
+
+async def run_command(state: VoiceState, transcript: str, doc_id: Optional[str] = None) -> dict:
+    """
+    Apply one spoken command to the connection's ReadingSession and build
+    the whole reply: what to say, the chunk to read next, and media
+    descriptions, so the client needs a single round trip per command.
+    """
+    intent  = classify(transcript)
+    name    = intent.name
+    session = state.session
+    reply: dict = {"intent": name, "confidence": intent.confidence, "transcript": transcript}
+
+    if doc_id and (session is None or session.doc_id != doc_id):
+        index = CHUNK_INDEX.get(doc_id)
+        if index is not None:
+            session = state.session = ReadingSession(index, outline=index.outline, doc_id=doc_id)
+            await state.restore(session)
+
+    # "read chapter three" classifies as start_read: jump there, then read
+    named = name == "start_read" and _NAMED_CHAPTER_RE.search(transcript)
+    if session and (named or name in ("unknown", "next", "prev", "open_file") and _CHAPTER_RE.search(transcript)):
+        if name == "next":
+            moved = session.next_chapter()
+        elif name == "prev":
+            moved = session.previous_chapter()
+        else:
+            name, moved = "jump_chapter", session.jump_to_chapter(_GOTO_RE.sub("", transcript))
+            if moved and named:
+                session.paused = False
+        if not moved:
+            reply["say"] = "I could not find that chapter."
+            name = "noop"
+
+    elif name == "change_language":
+        language = intent.payload["language"]
+        if session:
+            session.language = SPOKEN_LANGUAGES.get(language, "en-US")
+        reply["language"] = SPOKEN_LANGUAGES.get(language, "en-US")
+        reply["say"] = f"Language changed to {language.title()}."
+
+    elif name == "scan_files":
+        entries = await asyncio.to_thread(CATALOGUE.entries)
+        reply["files"] = [{"name": e.path.name, "title": e.title} for e in entries]
+        titles = ", ".join(f"{i + 1}. {e.title}" for i, e in enumerate(entries[:10]))
+        reply["say"] = f"I found {len(entries)} files. {titles}" if entries else "No documents found."
+
+    elif name == "open_file":
+        number = extract_file_number(transcript)
+        try:
+            if number is not None:
+                entries = await asyncio.to_thread(CATALOGUE.entries)
+                if number >= len(entries):
+                    raise HTTPException(404, f"There is no file number {number + 1}.")
+                path = entries[number].path
+            else:
+                path = await asyncio.to_thread(find_document, _GOTO_RE.sub("", transcript))
+            session = state.session = await open_reading_session(path)
+            await state.restore(session)
+        except HTTPException as e:
+            reply["say"] = e.detail
+            name = "noop"
+        else:
+            reply["say"] = f"Opening {path.stem.replace('_', ' ')}."
+
+    elif session is None and name in _READING_INTENTS | {"summarize", "explain", "key_points", "describe", "clarify"}:
+        reply["say"] = "Please open a document first."
+        name = "noop"
+
+    elif name in ("start_read", "resume"):
+        session.paused = False
+    elif name == "pause":
+        # Also valid with no document open: it stops whatever is playing
+        if session:
+            session.paused = True
+        reply["say"] = "Paused."
+    elif name == "next":
+        session.advance()
+    elif name == "prev":
+        session.back()
+    elif name in ("summarize", "explain", "clarify", "key_points"):
+        text = session.current
+        if name == "summarize":
+            reply["say"] = await ai_summarize(text, session.language) if OPENAI_AVAILABLE \
+                else await asyncio.to_thread(local_summarize, text)
+        elif name == "key_points":
+            reply["say"] = await asyncio.to_thread(extract_key_points, text)
+        else:
+            reply["say"] = await asyncio.to_thread(local_explain, text)
+    elif name == "describe":
+        pass  # media descriptions below
+    elif name in ("slower", "faster"):
+        step = RATE_STEP if name == "faster" else -RATE_STEP
+        if session:
+            session.rate = min(MAX_RATE, max(MIN_RATE, session.rate + step))
+        reply["rate"] = session.rate if session else None
+    elif name in ("louder", "quieter"):
+        reply["volume_step"] = VOLUME_STEP if name == "louder" else -VOLUME_STEP
+    elif name == "unknown":
+        reply["say"] = "Sorry, I didn't catch that."
+
+    # intent: what was heard; action: what the server did (noop = nothing to do)
+    reply["action"] = name
+    await state.remember()
+    if session is not None:
+        reply.update(doc_id=session.doc_id, position=session.index, total=len(session.chunks),
+                     paused=session.paused, language=reply.get("language", session.language),
+                     rate=session.rate, progress=session.progress_pct)
+        if session.is_done and name in _READING_INTENTS:
+            reply["say"] = "You have reached the end of the document."
+        elif name in _READING_INTENTS | {"describe"}:
+            index = session.chunks
+            reply["chunk"] = (await asyncio.to_thread(index.window, session.index, 1))[0]
+            reply["media_descriptions"] = await _media_descriptions(state, session)
+            if name != "describe":
+                state.prefetcher.update(session.doc_id, index, session.index, session.language, session.rate)
+            elif session.index not in reply["media_descriptions"]:
+                reply["say"] = "There is no picture or table in this part."
+            else:
+                reply["say"] = reply["media_descriptions"][session.index]
+    return reply
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# TEXT EXTRACTION
+# TEXT EXTRACTION (cached, off the event loop)
 # ─────────────────────────────────────────────────────────────────────────────
-def extract_text(path: str) -> str:
-    p   = pathlib.Path(path)
-    ext = p.suffix.lower()
-
-    if ext == ".pdf":
-        return extract_pdf(path)
-    elif ext == ".docx":
-        return extract_docx(path)
-    elif ext == ".epub":
-        return extract_epub(path)
-    elif ext == ".txt":
-        return p.read_text(encoding="utf-8", errors="replace")
-    return "Unsupported file format."
-
-
-def extract_pdf(path: str) -> str:
-    if not PDF_AVAILABLE:
-        return "PDF extraction not available. Please install PyMuPDF: pip install pymupdf"
-    doc  = fitz.open(path)
-    text = []
-    for page in doc:
-        page_text = page.get_text("text")
-        text.append(page_text)
-        # Detect images / tables on page
-        images = page.get_images(full=True)
-        if images:
-            text.append(f"\n[IMAGE: There are {len(images)} image(s) on this page.]\n")
-        tables = page.find_tables()
-        if tables and tables.tables:
-            for t in tables.tables:
-                text.append(f"\n[TABLE: {len(t.rows)} rows × {len(t.cols)} columns]\n")
-    return "\n".join(text)
-
-
-def extract_docx(path: str) -> str:
-    if not DOCX_AVAILABLE:
-        return "DOCX extraction not available. pip install python-docx"
-    doc  = DocxDocument(path)
-    text = []
-    for para in doc.paragraphs:
-        if para.text.strip():
-            text.append(para.text)
-    for table in doc.tables:
-        text.append(f"\n[TABLE: {len(table.rows)} rows × {len(table.columns)} columns]\n")
-        for row in table.rows:
-            text.append(" | ".join(c.text for c in row.cells))
-    return "\n".join(text)
-
-
-def extract_epub(path: str) -> str:
-    if not EPUB_AVAILABLE:
-        return "EPUB extraction not available. pip install ebooklib beautifulsoup4"
-    book   = epub.read_epub(path)
-    chunks = []
-    for item in book.get_items():
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            soup = BeautifulSoup(item.get_content(), "html.parser")
-            chunks.append(soup.get_text())
-    return "\n".join(chunks)
+EXTRACT_CACHE = ExtractionCache(
+    CACHE_DIR / "extract",
+    version=EXTRACTOR_VERSION,
+    max_disk_bytes=int(os.environ.get("EXTRACT_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    max_memory_items=int(os.environ.get("EXTRACT_CACHE_MEMORY_ITEMS", "16")),
+)
+
+# Parsing runs in worker processes so a large PDF never blocks /ws.
+EXTRACT_POOL = WorkerPool(
+    "extract",
+    kind="process",
+    max_workers=int(os.environ.get("EXTRACT_WORKERS", "0")) or None,
+    max_pending=int(os.environ.get("EXTRACT_MAX_PENDING", "0")) or None,
+    timeout=float(os.environ.get("EXTRACT_TIMEOUT", "120")),
+)
+
+
+# Chunk size matches the frontend's chunkText(text, 80)
+CHUNK_INDEX = ChunkIndexStore(CACHE_DIR / "chunks", version=EXTRACTOR_VERSION, words_per_chunk=80)
+
+SEARCH_INDEX = SearchIndex(CACHE_DIR / "search")
+
+# doc_id → resolved once the extraction that owns it ends (done or not)
+_extracting: Dict[str, asyncio.Future] = {}
+
+
+async def extract_text_async(path: str, on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """
+    extract_text() behind the content-addressed cache, parsed in the
+    extraction pool. Raises HTTPException 503/504 when saturated/slow.
+    """
+    try:
+        return "\n".join([page async for page in iter_document_pages(path, on_progress)])
+    except PoolBusyError:
+        raise HTTPException(503, "The server is busy processing other documents. Please try again shortly.")
+    except WorkerCrashedError as e:
+        raise HTTPException(503, "The document reader crashed on this file. Please try again shortly.") from e
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "This document is taking too long to process.")
+
+
+# First batch is a single page so speech can start immediately;
+# later batches grow up to STREAM_MAX_PAGES to amortise pool overhead.
+STREAM_MAX_PAGES   = int(os.environ.get("STREAM_MAX_PAGES", "16"))
+STREAM_MAX_CHUNKS  = 50
+
+
+async def iter_document_pages(path: str, on_progress: Optional[Callable[[int, int], None]] = None
+                              ) -> AsyncIterator[str]:
+    """
+    Yield a document unit by unit (PDF page / EPUB section), parsing page
+    ranges in EXTRACT_POOL while the caller consumes the previous range.
+    The assembled text and chunk index are persisted at the end; a cache
+    hit yields the whole text as a single unit. on_progress(done, total)
+    is called after every unit.
+    """
+    # Hashing a large file is blocking I/O too
+    doc_id = await asyncio.to_thread(EXTRACT_CACHE.document_id, path)
+    while True:
+        cached = await asyncio.to_thread(EXTRACT_CACHE.get, path)
+        if cached is not None and CHUNK_INDEX.exists(doc_id):
+            if doc_id not in SEARCH_INDEX:
+                await asyncio.to_thread(_search_index_document, doc_id)
+            if on_progress:
+                on_progress(1, 1)
+            yield cached
+            return
+        # Another opener is parsing this document: wait for it, then read
+        # its result from the cache (or take over if it gave up)
+        running = _extracting.get(doc_id)
+        if running is None:
+            break
+        METRICS.inc("extraction_waits_total")
+        await asyncio.shield(running)
+    done = _extracting[doc_id] = asyncio.get_running_loop().create_future()
+
+    try:
+        total  = await EXTRACT_POOL.run(count_pages, path)
+        pages: List[str] = []
+        start, size = 0, 1
+        pending = asyncio.ensure_future(EXTRACT_POOL.run(extract_page_range, path, 0, min(size, total)))
+        try:
+            while pending is not None:
+                batch = await pending
+                start += size
+                size   = min(size * 2, STREAM_MAX_PAGES)
+                pending = None
+                if start < total:
+                    pending = asyncio.ensure_future(
+                        EXTRACT_POOL.run(extract_page_range, path, start, min(start + size, total)))
+                for page in batch:
+                    pages.append(page)
+                    if on_progress:
+                        on_progress(len(pages), total)
+                    yield page
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+        # Don't persist "library not installed" placeholders
+        if extractor_available(pathlib.Path(path).suffix.lower()):
+            await asyncio.to_thread(EXTRACT_CACHE.put, path, "\n".join(pages))
+            toc = await EXTRACT_POOL.run(extract_outline, path)
+            await asyncio.to_thread(CHUNK_INDEX.build, doc_id, pages, pathlib.Path(path).name, toc)
+            await asyncio.to_thread(_search_index_document, doc_id)
+    finally:
+        del _extracting[doc_id]
+        done.set_result(None)
+
+
+def _search_index_document(doc_id: str):
+    index = CHUNK_INDEX.get(doc_id)
+    if index is not None:
+        SEARCH_INDEX.add_document(doc_id, index.filename, index)
+
+
+async def stream_document(path: str, words: int = 80) -> AsyncIterator[dict]:
+    """
+    Events for streamed reading: start → chunks (repeated) → end,
+    or an error event if extraction fails midway.
+    """
+    doc_id = await asyncio.to_thread(EXTRACT_CACHE.document_id, path)
+    yield {"type": "start", "filename": pathlib.Path(path).name, "doc_id": doc_id}
+    chunker = StreamChunker(words)
+    sent = 0
+    try:
+        page_no = 0
+        async for page in iter_document_pages(path):
+            page_no += 1
+            chunks = chunker.feed(page)
+            for i in range(0, len(chunks), STREAM_MAX_CHUNKS):
+                batch = chunks[i:i + STREAM_MAX_CHUNKS]
+                yield {"type": "chunks", "page": page_no, "offset": sent, "chunks": batch}
+                sent += len(batch)
+    except PoolBusyError:
+        yield {"type": "error", "data": "The server is busy processing other documents. Please try again shortly."}
+        return
+    except WorkerCrashedError:
+        yield {"type": "error", "data": "The document reader crashed on this file. Please try again shortly."}
+        return
+    except asyncio.TimeoutError:
+        yield {"type": "error", "data": "This document is taking too long to process."}
+        return
+    tail = chunker.flush()
+    if tail:
+        yield {"type": "chunks", "page": page_no, "offset": sent, "chunks": tail}
+        sent += len(tail)
+    index = CHUNK_INDEX.get(doc_id)
+    yield {"type": "end", "total_chunks": sent, "indexed_chunks": len(index) if index else 0}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # AI HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
+AI_CLIENT = OpenAIClient(
+    base_url=os.environ.get("OPENAI_BASE_URL"),
+    max_connections=int(os.environ.get("OPENAI_MAX_CONNECTIONS", "20")),
+    max_concurrency=int(os.environ.get("OPENAI_MAX_CONCURRENCY", "8")),
+    timeout=float(os.environ.get("OPENAI_TIMEOUT", "30")),
+)
+AI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+
+# Bump when a prompt changes so cached answers to the old prompt are not reused
+SUMMARY_PROMPT_VERSION  = 1
+DESCRIBE_PROMPT_VERSION = 1
+
+# Identical summaries / descriptions (a whole class on one chapter) hit OpenAI once
+AI_RESULTS = ResultCache(
+    max_items=int(os.environ.get("AI_CACHE_ITEMS", "2048")),
+    ttl=float(os.environ.get("AI_CACHE_TTL", str(24 * 3600))),
+)
+
+
+async def llm_summarize(text: str, language: str = "en") -> str:
+    """LLM summary, cached and coalesced. Raises when the API call fails."""
+    lang_name = {
+        "hi": "Hindi", "kn": "Kannada", "ta": "Tamil",
+        "te": "Telugu", "ml": "Malayalam", "mr": "Marathi",
+    }.get(language[:2], "English")
+    content = text[:3000]
+    key = hash_key("summary", SUMMARY_PROMPT_VERSION, AI_MODEL, lang_name, content)
+    with METRICS.timer("ai_seconds", task="summarize"):
+        summary = await AI_RESULTS.get_or_compute(key, lambda: AI_CLIENT.chat(
+            model=AI_MODEL,
+            messages=[{
+                "role": "system",
+                "content": f"Summarize the following text concisely in {lang_name}. Be brief and clear."
+            }, {
+                "role": "user",
+                "content": content
+            }],
+            max_tokens=200,
+        ))
+    if not summary:
+        raise ValueError("Empty completion")
+    return summary
+
+
 async def ai_summarize(text: str, language: str = "en") -> str:
     if OPENAI_AVAILABLE:
         try:
-            client = openai.AsyncOpenAI()
-            lang_name = {
-                "hi": "Hindi", "kn": "Kannada", "ta": "Tamil",
-                "te": "Telugu", "ml": "Malayalam", "mr": "Marathi",
-            }.get(language[:2], "English")
-            resp = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "system",
-                    "content": f"Summarize the following text concisely in {lang_name}. Be brief and clear."
-                }, {
-                    "role": "user",
-                    "content": text[:3000]
-                }],
-                max_tokens=200,
-            )
-            return resp.choices[0].message.content
+            return await llm_summarize(text, language)
         except Exception as e:
             logger.error(f"OpenAI summarize error: {e}")
+            METRICS.inc("ai_fallbacks_total", task="summarize", reason="error")
+    else:
+        METRICS.inc("ai_fallbacks_total", task="summarize", reason="unconfigured")
 
     # Fallback: extract first + last sentence
     import re
@@ -333,24 +1471,49 @@ async def ai_summarize(text: str, language: str = "en") -> str:
 async def ai_describe_image(context: str) -> str:
     if OPENAI_AVAILABLE:
         try:
-            client = openai.AsyncOpenAI()
-            resp = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "system",
-                    "content": "You are an assistant helping blind students. Describe the chart, graph, or image based on the surrounding document context."
-                }, {
-                    "role": "user",
-                    "content": f"Context: {context[:1000]}\nDescribe what visual element likely appears here."
-                }],
-                max_tokens=150,
-            )
-            return resp.choices[0].message.content
+            content = context[:1000]
+            key = hash_key("describe", DESCRIBE_PROMPT_VERSION, AI_MODEL, content)
+            with METRICS.timer("ai_seconds", task="describe"):
+                return await AI_RESULTS.get_or_compute(key, lambda: AI_CLIENT.chat(
+                    model=AI_MODEL,
+                    messages=[{
+                        "role": "system",
+                        "content": "You are an assistant helping blind students. Describe the chart, graph, or image based on the surrounding document context."
+                    }, {
+                        "role": "user",
+                        "content": f"Context: {content}\nDescribe what visual element likely appears here."
+                    }],
+                    max_tokens=150,
+                ))
         except Exception as e:
             logger.error(f"OpenAI describe error: {e}")
+            METRICS.inc("ai_fallbacks_total", task="describe", reason="error")
+    else:
+        METRICS.inc("ai_fallbacks_total", task="describe", reason="unconfigured")
     return "This section contains a visual element such as a chart or diagram. It likely illustrates the data discussed in the surrounding text."
 
 
+async def summarize_part(text: str, language: str = "en") -> str:
+    """One map/reduce step: the LLM when configured (raising on failure), else extractive."""
+    if OPENAI_AVAILABLE:
+        return await llm_summarize(text, language)
+    return await asyncio.to_thread(local_summarize, text)
+
+
+async def summarize_part_fallback(text: str, language: str = "en") -> str:
+    # Stands in for a failed LLM step; never persisted
+    METRICS.inc("ai_fallbacks_total", task="document_summary", reason="error")
+    return await asyncio.to_thread(local_summarize, text)
+
+
+DOC_SUMMARIZER = DocumentSummarizer(
+    summarize_part,
+    tag=f"{AI_MODEL}-p{SUMMARY_PROMPT_VERSION}" if OPENAI_AVAILABLE else "local",
+    fallback=summarize_part_fallback,
+    concurrency=int(os.environ.get("SUMMARY_CONCURRENCY", "4")),
+)
+
+
 def detect_language_hint(text: str) -> str:
     """Lightweight language detection using character ranges."""
     devanagari = sum(1 for c in text if '\u0900' <= c <= '\u097F')
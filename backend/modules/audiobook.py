@@ -0,0 +1,244 @@
+"""
+VOICE4BLIND — Audiobooks
+A whole document or chapter rendered ahead of time into one seekable
+audio file, plus a chunk → timestamp index, so playback, seeking and
+download need no synthesis at listen time.
+
+Chunks are synthesized in parallel (and land in the TTS audio cache,
+shared with live reading) but written in order as they finish, so only
+a small window of audio is ever held in memory. MP3 segments (gTTS,
+Azure MP3) are joined frame-exactly; WAV segments (Azure default,
+pyttsx3) are merged under a single RIFF header.
+"""
+
+import os
+import json
+import struct
+import asyncio
+import logging
+import pathlib
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+from .cache import hash_key
+from .chunk_index import ChunkIndex
+
+logger = logging.getLogger("voice4blind.audiobook")
+
+Synth = Callable[[str, str, float], Awaitable[Optional[bytes]]]
+Progress = Callable[[int, int], None]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Segment formats
+# ─────────────────────────────────────────────────────────────────────────────
+_MP3_BITRATES = {   # kbit/s for Layer III, by "MPEG1?"
+    True:  [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _mp3_payload(data: bytes) -> bytes:
+    """Audio frames only: leading ID3v2 and trailing ID3v1 tags removed."""
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        data = data[10 + size + (10 if data[5] & 0x10 else 0):]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def _mp3_seconds(data: bytes) -> float:
+    """Playing time of MPEG Layer III frames, walking frame headers."""
+    seconds, pos, end = 0.0, 0, len(data) - 4
+    while pos <= end:
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+        if data[pos] != 0xFF or b1 & 0xE0 != 0xE0 or version == 1 or layer != 1:
+            pos += 1  # not a Layer III frame header: resync
+            continue
+        mpeg1   = version == 3
+        bitrate = _MP3_BITRATES[mpeg1][b2 >> 4] if b2 >> 4 < 15 else 0
+        rate_i  = (b2 >> 2) & 3
+        if not bitrate or rate_i == 3:
+            pos += 1
+            continue
+        rate    = _MP3_RATES[version][rate_i]
+        samples = 1152 if mpeg1 else 576
+        seconds += samples / rate
+        pos     += samples // 8 * bitrate * 1000 // rate + ((b2 >> 1) & 1)
+    return seconds
+
+
+def _wav_parts(data: bytes) -> Tuple[bytes, bytes]:
+    """(fmt chunk body, PCM data) of a RIFF/WAVE file."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    fmt, pos = None, 12
+    while pos + 8 <= len(data):
+        cid, size = data[pos:pos + 4], struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        body = data[pos + 8:pos + 8 + size]   # streamed WAVs may declare a bogus size
+        if cid == b"fmt ":
+            fmt = body
+        elif cid == b"data" and fmt is not None:
+            return fmt, body
+        pos += 8 + size + (size & 1)
+    raise ValueError("WAV file without fmt/data chunks")
+
+
+class _AudioWriter:
+    """Appends segments to one file; returns each one's byte offset and time span."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path    = path
+        self.file    = open(path, "wb")
+        self.mime: Optional[str] = None
+        self.fmt: Optional[bytes] = None
+        self.seconds = 0.0
+        self._data_size_at = 0
+
+    def add(self, audio: bytes) -> Tuple[int, float, float]:
+        mime = "audio/wav" if audio[:4] == b"RIFF" else "audio/mpeg"
+        if self.mime is None:
+            self.mime = mime
+        elif mime != self.mime:
+            raise ValueError("Segments came back in different audio formats")
+
+        if mime == "audio/wav":
+            fmt, payload = _wav_parts(audio)
+            if self.fmt is None:
+                self._write_wav_header(fmt)
+            elif fmt != self.fmt:
+                raise ValueError("Segments came back with different WAV formats")
+            byte_rate, block_align = struct.unpack("<IH", fmt[8:14])
+            payload  = payload[:len(payload) - len(payload) % max(block_align, 1)]  # whole frames only
+            duration = len(payload) / byte_rate if byte_rate else 0.0
+        else:
+            payload  = _mp3_payload(audio)
+            duration = _mp3_seconds(payload)
+
+        offset, start = self.file.tell(), self.seconds
+        self.file.write(payload)
+        self.seconds += duration
+        return offset, start, self.seconds
+
+    def _write_wav_header(self, fmt: bytes):
+        self.fmt = fmt
+        self.file.write(b"RIFF\0\0\0\0WAVEfmt " + struct.pack("<I", len(fmt)) + fmt
+                        + (b"\0" if len(fmt) & 1 else b"") + b"data")
+        self._data_size_at = self.file.tell()
+        self.file.write(b"\0\0\0\0")
+
+    def finish(self) -> int:
+        """Patch the WAV sizes, close, and return the file size."""
+        size = self.file.tell()
+        if self.fmt is not None:
+            self.file.seek(4)
+            self.file.write(struct.pack("<I", size - 8))
+            self.file.seek(self._data_size_at)
+            self.file.write(struct.pack("<I", size - self._data_size_at - 4))
+        self.file.close()
+        return size
+
+    def abort(self):
+        self.file.close()
+        self.path.unlink(missing_ok=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────────────────────────────────────
+class AudiobookStore:
+    """
+    <book_id>.json (the index) next to <book_id>.mp3 / .wav. The id covers
+    the chunk range, index version, language, rate and voice, so a new
+    voice or re-chunked document renders a new book.
+    """
+
+    def __init__(self, directory: pathlib.Path, synth: Synth, concurrency: int = 4):
+        self.directory   = pathlib.Path(directory)
+        self.synth       = synth
+        self.concurrency = concurrency
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def book_id(self, index: ChunkIndex, start: int, stop: int, language: str,
+                rate: float, voice: str) -> str:
+        return hash_key(index.doc_id, index.version, index.words_per_chunk,
+                        start, stop, language, round(rate, 2), voice)[:16]
+
+    def get(self, book_id: str) -> Optional[dict]:
+        """The finished book's index, or None."""
+        if not book_id.isalnum():
+            return None
+        try:
+            return json.loads((self.directory / f"{book_id}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def audio_path(self, book: dict) -> pathlib.Path:
+        return self.directory / book["file"]
+
+    async def render(self, index: ChunkIndex, start: int, stop: int, language: str,
+                     rate: float, voice: str, on_progress: Optional[Progress] = None) -> dict:
+        """Render chunks [start, stop) unless that book already exists; returns its index."""
+        book_id = self.book_id(index, start, stop, language, rate, voice)
+        book = await asyncio.to_thread(self.get, book_id)
+        if book is not None:
+            return book
+
+        tmp    = self.directory / f".{book_id}.part"
+        writer = await asyncio.to_thread(_AudioWriter, tmp)
+        chunks: List[dict] = []
+        positions = iter(range(start, stop))
+        pending: Deque[Tuple[int, asyncio.Task]] = deque()
+
+        async def segment(i: int) -> Optional[bytes]:
+            text = await asyncio.to_thread(index.__getitem__, i)
+            return await self.synth(text, language, rate) if text.strip() else b""
+
+        def launch():
+            i = next(positions, None)
+            if i is not None:
+                pending.append((i, asyncio.create_task(segment(i))))
+
+        try:
+            # At most `concurrency` segments are in flight or waiting to be written
+            for _ in range(self.concurrency):
+                launch()
+            while pending:
+                i, task = pending.popleft()
+                audio = await task
+                launch()
+                if audio is None:
+                    raise RuntimeError(f"No audio for chunk {i}")
+                if audio:
+                    offset, t0, t1 = await asyncio.to_thread(writer.add, audio)
+                else:
+                    offset, t0, t1 = writer.file.tell(), writer.seconds, writer.seconds
+                chunks.append({"chunk": i, "offset": offset, "start": round(t0, 3), "end": round(t1, 3)})
+                if on_progress:
+                    on_progress(len(chunks), stop - start)
+            size = await asyncio.to_thread(writer.finish)
+        except BaseException:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        mime = writer.mime or "audio/mpeg"
+        book = {
+            "id": book_id, "doc_id": index.doc_id, "title": index.filename,
+            "start": start, "stop": stop, "language": language, "rate": rate, "voice": voice,
+            "file": f"{book_id}{'.wav' if mime == 'audio/wav' else '.mp3'}",
+            "mime": mime, "bytes": size, "duration": round(writer.seconds, 3), "chunks": chunks,
+        }
+        await asyncio.to_thread(self._publish, tmp, book)
+        logger.info(f"Rendered audiobook {book_id}: {len(chunks)} chunks, {book['duration']:.0f}s")
+        return book
+
+    def _publish(self, tmp: pathlib.Path, book: dict):
+        os.replace(tmp, self.directory / book["file"])
+        meta = self.directory / f"{book['id']}.json.tmp"
+        meta.write_text(json.dumps(book, ensure_ascii=False), encoding="utf-8")
+        os.replace(meta, self.directory / f"{book['id']}.json")
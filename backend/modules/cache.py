@@ -0,0 +1,284 @@
+"""
+VOICE4BLIND — Cache
+Content-addressed caching: a bounded in-memory LRU in front of
+an on-disk store with size-based eviction and hit/miss counters,
+plus an in-memory TTL cache for AI results with request coalescing.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("voice4blind.cache")
+
+_READ_BLOCK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GENERIC TWO-TIER CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+class DiskLRUCache:
+    """
+    Key → bytes cache. Memory tier is an LRU bounded by item count and
+    total bytes; disk tier is bounded by total bytes, evicting the least
+    recently used files (mtime is refreshed on every disk hit).
+    """
+
+    def __init__(self, directory: pathlib.Path, max_disk_bytes: int = 512 * 1024 * 1024,
+                 max_memory_items: int = 32, max_memory_bytes: int = 64 * 1024 * 1024,
+                 suffix: str = ".bin"):
+        self.directory        = pathlib.Path(directory)
+        self.max_disk_bytes   = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.max_memory_bytes = max_memory_bytes
+        self.suffix           = suffix
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits   = 0
+        self.misses      = 0
+        self.evictions   = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._disk_bytes = sum(p.stat().st_size for p in self.directory.rglob(f"*{suffix}"))
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}{self.suffix}"
+
+    # ── Memory tier ──────────────────────────────────────────────────────────
+    def _remember(self, key: str, value: bytes):
+        if len(value) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while (len(self._memory) > self.max_memory_items
+               or self._memory_bytes > self.max_memory_bytes):
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+    def _evict_disk(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        files = []
+        for p in self.directory.rglob(f"*{self.suffix}"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        files.sort()
+        for _, size, p in files:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            self._memory_bytes -= len(self._memory.pop(p.stem, b""))
+            self._disk_bytes -= size
+            self.evictions   += 1
+
+    # ── Public API ───────────────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            path = self._path(key)
+            try:
+                value = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: bytes):
+        with self._lock:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                old_size = path.stat().st_size
+            except OSError:
+                old_size = 0
+            tmp = path.with_suffix(".tmp")
+            try:
+                tmp.write_bytes(value)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.error(f"Cache write failed for {key}: {e}")
+                return
+            self._disk_bytes += len(value) - old_size
+            self._remember(key, value)
+            self._evict_disk()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits":   self.memory_hits,
+                "disk_hits":     self.disk_hits,
+                "misses":        self.misses,
+                "evictions":     self.evictions,
+                "hit_ratio":     round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "memory_items":  len(self._memory),
+                "memory_bytes":  self._memory_bytes,
+                "disk_bytes":    self._disk_bytes,
+            }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EXTRACTED-TEXT CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+class ExtractionCache:
+    """
+    Extracted document text keyed by file content hash + extractor version.
+    Digests are memoised per (path, size, mtime) so a reopen does not
+    re-hash the whole file.
+    """
+
+    _DIGEST_MEMO_SIZE = 1024
+
+    def __init__(self, directory: pathlib.Path, version: int, **kwargs):
+        self.version = version
+        self.store   = DiskLRUCache(directory, suffix=".txt", **kwargs)
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, path: str) -> str:
+        st  = os.stat(path)
+        sig = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(sig)
+            if cached:
+                self._digests.move_to_end(sig)
+                return cached
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[sig] = digest
+            if len(self._digests) > self._DIGEST_MEMO_SIZE:
+                self._digests.popitem(last=False)
+        return digest
+
+    def remember_digest(self, path: str, digest: str):
+        """Record a digest computed elsewhere (e.g. while streaming an upload)."""
+        st = os.stat(path)
+        with self._lock:
+            self._digests[(str(path), st.st_size, st.st_mtime_ns)] = digest
+
+    def document_id(self, path: str) -> str:
+        """Short stable id for a document's content."""
+        return self.digest(path)[:16]
+
+    def key(self, path: str) -> str:
+        return f"{self.digest(path)}-v{self.version}"
+
+    def get(self, path: str) -> Optional[str]:
+        data = self.store.get(self.key(path))
+        return data.decode("utf-8") if data is not None else None
+
+    def put(self, path: str, text: str):
+        self.store.put(self.key(path), text.encode("utf-8"))
+
+    def stats(self) -> Dict[str, float]:
+        return self.store.stats()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# AI RESULT CACHE — TTL + LRU, concurrent identical requests share one call
+# ─────────────────────────────────────────────────────────────────────────────
+def hash_key(*parts: Any) -> str:
+    """SHA-256 over the parts, NUL-separated so ('ab','c') != ('a','bc')."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Key → value in memory, evicting the least recently used entry past
+    max_items and treating entries older than ttl seconds as missing.
+    Used from the event loop only (no locking).
+    """
+
+    def __init__(self, max_items: int = 1024, ttl: float = 24 * 3600):
+        self.max_items = max_items
+        self.ttl       = ttl
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = self.misses = self.coalesced = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value, else await compute() — once per key however many
+        callers ask concurrently. Exceptions reach every waiter and are
+        not cached; a waiter being cancelled does not cancel the call.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None) if self._inflight.get(key) is f else None)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {"items": len(self._items), "in_flight": len(self._inflight),
+                "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
@@ -0,0 +1,126 @@
+"""
+VOICE4BLIND — File Catalogue
+In-memory index of readable documents in the upload folder and the
+user's Downloads / Documents / Desktop, refreshed incrementally.
+
+A folder is only re-listed when its own mtime changes (a file was added,
+removed or renamed), and that check is throttled, so listing and opening
+by name never walk the disk on the hot path.
+"""
+
+import os
+import time
+import logging
+import pathlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("voice4blind.catalogue")
+
+
+def normalize_name(name: str) -> str:
+    """'Maths Notes' / 'maths_notes' → 'mathsnotes'."""
+    return name.lower().replace("_", "").replace(" ", "")
+
+
+@dataclass
+class CatalogueEntry:
+    path: pathlib.Path
+    title: str        # spoken/display name, e.g. "Maths Notes"
+    norm: str         # normalize_name(stem)
+    ext: str
+    size: int
+    mtime: float
+
+
+class FileCatalogue:
+    def __init__(self, roots: Iterable[pathlib.Path], extensions: Iterable[str],
+                 check_interval: float = 2.0):
+        self.roots          = [pathlib.Path(r) for r in roots]
+        self.extensions     = {e.lower() for e in extensions}
+        self.check_interval = check_interval
+
+        self._dir_mtimes: Dict[pathlib.Path, Optional[int]] = {r: None for r in self.roots}
+        self._by_root: Dict[pathlib.Path, List[CatalogueEntry]] = {r: [] for r in self.roots}
+        self._entries: List[CatalogueEntry] = []
+        self._by_norm: Dict[str, CatalogueEntry] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.rescans = 0
+
+    # ── Refresh ──────────────────────────────────────────────────────────────
+    def refresh(self, force: bool = False) -> bool:
+        """Re-list folders whose mtime changed. Returns True if anything did."""
+        changed = False
+        with self._lock:
+            for root in self.roots:
+                try:
+                    mtime = root.stat().st_mtime_ns
+                except OSError:
+                    mtime = None
+                if not force and mtime == self._dir_mtimes[root]:
+                    continue
+                self._dir_mtimes[root] = mtime
+                self._by_root[root] = self._scan(root) if mtime is not None else []
+                self.rescans += 1
+                changed = True
+            if changed:
+                self._rebuild()
+            self._last_check = time.monotonic()
+        return changed
+
+    def maybe_refresh(self):
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.refresh()
+
+    def _scan(self, root: pathlib.Path) -> List[CatalogueEntry]:
+        previous = {e.path: e for e in self._by_root.get(root, [])}
+        entries = []
+        try:
+            with os.scandir(root) as it:
+                for de in it:
+                    ext = os.path.splitext(de.name)[1].lower()
+                    if ext not in self.extensions or not de.is_file():
+                        continue
+                    st   = de.stat()
+                    path = pathlib.Path(de.path)
+                    old  = previous.get(path)
+                    if old and old.size == st.st_size and old.mtime == st.st_mtime:
+                        entries.append(old)
+                        continue
+                    stem = path.stem
+                    entries.append(CatalogueEntry(
+                        path=path, title=stem.replace("_", " ").title(), norm=normalize_name(stem),
+                        ext=ext, size=st.st_size, mtime=st.st_mtime,
+                    ))
+        except OSError as e:
+            logger.warning(f"Cannot list {root}: {e}")
+        entries.sort(key=lambda e: e.path.name)
+        return entries
+
+    def _rebuild(self):
+        self._entries = [e for r in self.roots for e in self._by_root[r]]
+        by_norm: Dict[str, CatalogueEntry] = {}
+        for e in self._entries:
+            by_norm.setdefault(e.norm, e)  # earlier roots (uploads) win
+        self._by_norm = by_norm
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+    def entries(self) -> List[CatalogueEntry]:
+        self.maybe_refresh()
+        return self._entries
+
+    def resolve(self, name: str) -> Optional[CatalogueEntry]:
+        """Exact normalized-name hit, else first entry whose name contains it."""
+        self.maybe_refresh()
+        norm = normalize_name(name)
+        if not norm:
+            return None
+        entry = self._by_norm.get(norm)
+        if entry is not None:
+            return entry
+        return next((e for e in self._entries if norm in e.norm), None)
+
+    def stats(self) -> dict:
+        return {"files": len(self._entries), "roots": len(self.roots), "rescans": self.rescans}
@@ -0,0 +1,214 @@
+"""
+VOICE4BLIND — Chunk Index
+Per-document index of speakable chunks, built once at extraction time
+and persisted so clients can page through a book without downloading it.
+
+On disk, per document id:
+    chunks.txt  — UTF-8 chunk texts back to back
+    index.json  — byte offsets + page / media / heading columns
+    outline.json — chapter outline mapped to chunk positions
+    summaries.json — block summaries (written by DocumentSummarizer)
+"""
+
+import os
+import re
+import json
+import uuid
+import logging
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .document_processor import StreamChunker, detect_heading, is_media_chunk
+from .outline import OutlineIndex, build_outline
+
+logger = logging.getLogger("voice4blind.chunks")
+
+
+class ChunkIndex:
+    """Read side: O(1) random access into a persisted chunk list."""
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = pathlib.Path(directory)
+        meta = json.loads((self.directory / "index.json").read_text(encoding="utf-8"))
+        self.doc_id          = meta["doc_id"]
+        self.filename        = meta.get("filename", "")
+        self.version         = meta["version"]
+        self.words_per_chunk = meta["words_per_chunk"]
+        self.offsets: List[int]   = meta["offsets"]
+        self.pages:   List[int]   = meta["pages"]
+        self.media:   List[str]   = meta["media"]
+        self.headings: List[bool] = meta["headings"]
+        self._text_path = self.directory / "chunks.txt"
+        self._outline: Optional[OutlineIndex] = None
+
+    @property
+    def outline(self) -> OutlineIndex:
+        if self._outline is None:
+            try:
+                self._outline = OutlineIndex.load(self.directory / "outline.json")
+            except (OSError, ValueError):
+                self._outline = OutlineIndex([])
+        return self._outline
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._read(i, i + 1)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._read(0, len(self)))
+
+    def _read(self, start: int, stop: int) -> List[str]:
+        with open(self._text_path, "rb") as f:
+            f.seek(self.offsets[start])
+            blob = f.read(self.offsets[stop] - self.offsets[start])
+        base = self.offsets[start]
+        return [
+            blob[self.offsets[i] - base:self.offsets[i + 1] - base].decode("utf-8")
+            for i in range(start, stop)
+        ]
+
+    def texts(self, start: int, stop: int) -> List[str]:
+        """Chunk texts [start, stop) in one read."""
+        start = max(0, min(start, len(self)))
+        return self._read(start, max(start, min(stop, len(self))))
+
+    def window(self, start: int, count: int) -> List[dict]:
+        """Chunks [start, start+count) with their metadata."""
+        start = max(0, min(start, len(self)))
+        stop  = min(start + max(count, 0), len(self))
+        return [
+            {
+                "index":   i,
+                "text":    text,
+                "page":    self.pages[i],
+                "media":   self.media[i] or None,
+                "heading": self.headings[i],
+            }
+            for i, text in zip(range(start, stop), self._read(start, stop))
+        ]
+
+
+# Document ids are content digests (ExtractionCache.document_id); anything
+# else is a client typo or a path, and must never reach the filesystem
+_DOC_ID_RE = re.compile(r"[0-9a-f]{16}")
+
+
+def _valid_doc_id(doc_id) -> bool:
+    return isinstance(doc_id, str) and _DOC_ID_RE.fullmatch(doc_id) is not None
+
+
+class ChunkIndexStore:
+    """Builds, persists and caches open ChunkIndex objects by document id."""
+
+    def __init__(self, directory: pathlib.Path, version: int,
+                 words_per_chunk: int = 80, max_open: int = 32):
+        self.directory       = pathlib.Path(directory)
+        self.version         = version
+        self.words_per_chunk = words_per_chunk
+        self.max_open        = max_open
+        self._open: "OrderedDict[str, ChunkIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, doc_id: str) -> pathlib.Path:
+        if not _valid_doc_id(doc_id):
+            raise ValueError(f"Invalid document id: {doc_id!r}")
+        return self.directory / doc_id
+
+    def get(self, doc_id: str) -> Optional[ChunkIndex]:
+        if not _valid_doc_id(doc_id):
+            return None
+        with self._lock:
+            index = self._open.get(doc_id)
+            if index is not None:
+                self._open.move_to_end(doc_id)
+                return index
+        try:
+            index = ChunkIndex(self._dir(doc_id))
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.version != self.version or index.words_per_chunk != self.words_per_chunk:
+            return None
+        self._remember(index)
+        return index
+
+    def exists(self, doc_id: str) -> bool:
+        return self.get(doc_id) is not None
+
+    def _remember(self, index: ChunkIndex):
+        with self._lock:
+            self._open[index.doc_id] = index
+            self._open.move_to_end(index.doc_id)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+
+    def build(self, doc_id: str, pages: Sequence[str], filename: str = "",
+              toc: Sequence[Tuple[int, str, int]] = ()) -> ChunkIndex:
+        """
+        Chunk page texts (1-based page numbers) and persist the index,
+        plus an outline from the native toc (or detected headings).
+        """
+        target = self._dir(doc_id)
+        target.mkdir(parents=True, exist_ok=True)
+        # Unique temp names: two first opens of one document may build at
+        # once (same content), and neither may clobber the other's files
+        suffix   = f".{uuid.uuid4().hex}.tmp"
+        tmp_text = target / f"chunks.txt{suffix}"
+        tmp_meta = target / f"index.json{suffix}"
+        try:
+            self._write(target, tmp_text, tmp_meta, doc_id, pages, filename, toc)
+        finally:
+            tmp_text.unlink(missing_ok=True)
+            tmp_meta.unlink(missing_ok=True)
+
+        index = ChunkIndex(target)
+        self._remember(index)
+        logger.info(f"Indexed {filename or doc_id}: {len(index)} chunks")
+        return index
+
+    def _write(self, target: pathlib.Path, tmp_text: pathlib.Path, tmp_meta: pathlib.Path,
+               doc_id: str, pages: Sequence[str], filename: str,
+               toc: Sequence[Tuple[int, str, int]]):
+        """Write chunks.txt, outline.json and index.json via temp files."""
+        chunker = StreamChunker(self.words_per_chunk)
+        offsets, page_nos, media, headings, texts = [0], [], [], [], []
+        with open(tmp_text, "wb") as out:
+            def emit(chunk: str, page: int):
+                data = chunk.encode("utf-8")
+                out.write(data)
+                offsets.append(offsets[-1] + len(data))
+                page_nos.append(page)
+                texts.append(chunk)
+                is_media, kind = is_media_chunk(chunk)
+                media.append(kind if is_media else "")
+                headings.append(detect_heading(chunk) is not None)
+
+            tail_page = page = 1
+            for page, text in enumerate(pages, 1):
+                # The first chunk may continue a sentence from an earlier page
+                start_page = tail_page if chunker.has_tail else page
+                chunks = chunker.feed(text)
+                for n, chunk in enumerate(chunks):
+                    emit(chunk, start_page if n == 0 else page)
+                if chunks or start_page == page:
+                    tail_page = page
+            for chunk in chunker.flush():
+                emit(chunk, tail_page)
+
+        meta = {
+            "doc_id": doc_id, "filename": filename, "version": self.version,
+            "words_per_chunk": self.words_per_chunk, "offsets": offsets,
+            "pages": page_nos, "media": media, "headings": headings,
+        }
+        tmp_meta.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        build_outline(toc, pages, page_nos, texts).save(target / "outline.json")
+        os.replace(tmp_text, target / "chunks.txt")
+        os.replace(tmp_meta, target / "index.json")   # last: index.json marks the index complete
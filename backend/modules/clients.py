@@ -0,0 +1,103 @@
+"""
+VOICE4BLIND — Shared API Clients
+One long-lived OpenAI client per process: a pooled keep-alive HTTP
+connection set, a cap on concurrent requests, and a warm-up at startup
+so the first summary doesn't pay for DNS + TLS.
+
+Point OPENAI_BASE_URL at a local stand-in server to test without the
+real API.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger("voice4blind.clients")
+
+try:
+    import httpx
+    import openai
+    OPENAI_AVAILABLE = bool(os.environ.get("OPENAI_API_KEY"))
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+class OpenAIClient:
+    """
+    Lazily built on first use inside the running event loop (the HTTP
+    pool and semaphore are loop-bound). close() releases the pool; the
+    next call builds a fresh one.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: int = 20,
+                 max_concurrency: int = 8, timeout: float = 30.0,
+                 keepalive_expiry: float = 60.0, max_retries: int = 2):
+        self.base_url         = base_url or None
+        self.max_connections  = max_connections
+        self.max_concurrency  = max_concurrency
+        self.timeout          = timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.max_retries      = max_retries
+
+        self._client = None
+        self._http   = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.requests  = 0
+        self.errors    = 0
+        self.in_flight = 0
+
+    @property
+    def available(self) -> bool:
+        return OPENAI_AVAILABLE
+
+    def _ensure(self):
+        if self._client is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+            self._client = openai.AsyncOpenAI(
+                base_url=self.base_url, http_client=self._http, max_retries=self.max_retries,
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def chat(self, **kwargs) -> str:
+        """chat.completions.create(**kwargs) → first choice's text. Raises on failure."""
+        client = self._ensure()
+        async with self._slots:
+            self.in_flight += 1
+            self.requests  += 1
+            try:
+                resp = await client.chat.completions.create(**kwargs)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+        return resp.choices[0].message.content
+
+    async def warm_up(self):
+        """Open a pooled connection ahead of the first real request."""
+        if not OPENAI_AVAILABLE:
+            return
+        client = self._ensure()
+        try:
+            await self._http.head(str(client.base_url))
+            logger.info(f"OpenAI connection warmed ({client.base_url})")
+        except Exception as e:
+            logger.warning(f"OpenAI warm-up failed: {e}")
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+        self._client = self._http = self._slots = None
+
+    def stats(self) -> dict:
+        return {"available": OPENAI_AVAILABLE, "requests": self.requests,
+                "errors": self.errors, "in_flight": self.in_flight}
@@ -5,12 +5,206 @@ and context-aware description for blind learners.
 """
 
 import re
+import hashlib
 import pathlib
 import logging
-from typing import List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
 
 logger = logging.getLogger("voice4blind.doc")
 
+# ── Optional heavy deps (graceful fallback) ──────────────────────────────────
+try:
+    import fitz  # PyMuPDF
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+    logger.warning("PyMuPDF not installed — PDF extraction disabled")
+
+try:
+    from docx import Document as DocxDocument
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import ebooklib
+    from ebooklib import epub
+    from bs4 import BeautifulSoup
+    EPUB_AVAILABLE = True
+except ImportError:
+    EPUB_AVAILABLE = False
+
+# Bump whenever extractor output changes so stale cache entries are ignored.
+EXTRACTOR_VERSION = 2
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TEXT EXTRACTION
+# (module-level functions so they can be shipped to worker processes)
+# ─────────────────────────────────────────────────────────────────────────────
+def extractor_available(ext: str) -> bool:
+    return {
+        ".pdf": PDF_AVAILABLE, ".docx": DOCX_AVAILABLE,
+        ".epub": EPUB_AVAILABLE, ".txt": True,
+    }.get(ext, False)
+
+
+def extract_text(path: str) -> str:
+    p   = pathlib.Path(path)
+    ext = p.suffix.lower()
+
+    if ext == ".pdf":
+        return extract_pdf(path)
+    elif ext == ".docx":
+        return extract_docx(path)
+    elif ext == ".epub":
+        return extract_epub(path)
+    elif ext == ".txt":
+        return p.read_text(encoding="utf-8", errors="replace")
+    return "Unsupported file format."
+
+
+def count_pages(path: str) -> int:
+    """Number of streamable units: PDF pages, EPUB documents, else 1."""
+    ext = pathlib.Path(path).suffix.lower()
+    if ext == ".pdf" and PDF_AVAILABLE:
+        with fitz.open(path) as doc:
+            return doc.page_count
+    if ext == ".epub" and EPUB_AVAILABLE:
+        return len(_epub_documents(epub.read_epub(path)))
+    return 1
+
+
+def extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract units [start, stop). "\n".join() over all units equals
+    extract_text(), so streamed and cached output never diverge.
+    """
+    ext = pathlib.Path(path).suffix.lower()
+    if ext == ".pdf" and PDF_AVAILABLE:
+        return list(iter_pdf_pages(path, start, stop))
+    if ext == ".epub" and EPUB_AVAILABLE:
+        return list(iter_epub_pages(path, start, stop))
+    return [extract_text(path)] if start == 0 else []
+
+
+def extract_pdf(path: str) -> str:
+    if not PDF_AVAILABLE:
+        return "PDF extraction not available. Please install PyMuPDF: pip install pymupdf"
+    return "\n".join(iter_pdf_pages(path))
+
+
+def iter_pdf_pages(path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yield one text block per page, with image/table markers appended."""
+    with fitz.open(path) as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for pno in range(start, stop):
+            with METRICS.timer("pdf_page_seconds"):
+                page = doc[pno]
+                text = [page.get_text("text")]
+                # Detect images / tables on page
+                images = page.get_images(full=True)
+            if images:
+                text.append(f"\n[IMAGE: There are {len(images)} image(s) on this page.]\n")
+            with METRICS.timer("pdf_find_tables_seconds"):
+                tables = page.find_tables()
+            if tables and tables.tables:
+                for t in tables.tables:
+                    text.append(f"\n[TABLE: {t.row_count} rows × {t.col_count} columns]\n")
+            yield "\n".join(text)
+
+
+def extract_docx(path: str) -> str:
+    if not DOCX_AVAILABLE:
+        return "DOCX extraction not available. pip install python-docx"
+    doc  = DocxDocument(path)
+    text = []
+    for para in doc.paragraphs:
+        if para.text.strip():
+            text.append(para.text)
+    for table in doc.tables:
+        text.append(f"\n[TABLE: {len(table.rows)} rows × {len(table.columns)} columns]\n")
+        for row in table.rows:
+            text.append(" | ".join(c.text for c in row.cells))
+    return "\n".join(text)
+
+
+def extract_epub(path: str) -> str:
+    if not EPUB_AVAILABLE:
+        return "EPUB extraction not available. pip install ebooklib beautifulsoup4"
+    return "\n".join(iter_epub_pages(path))
+
+
+def iter_epub_pages(path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each XHTML document in the book."""
+    items = _epub_documents(epub.read_epub(path))
+    for item in items[start:stop]:
+        soup = BeautifulSoup(item.get_content(), "html.parser")
+        yield soup.get_text()
+
+
+def _epub_documents(book) -> list:
+    """XHTML documents in reading (spine) order, without the nav / TOC page."""
+    items = []
+    for entry in book.spine:
+        item = book.get_item_with_id(entry[0] if isinstance(entry, (tuple, list)) else entry)
+        if (item is None or item.get_type() != ebooklib.ITEM_DOCUMENT
+                or isinstance(item, epub.EpubNav) or "nav" in (getattr(item, "properties", None) or ())):
+            continue
+        items.append(item)
+    return items
+
+
+def extract_outline(path: str) -> List[Tuple[int, str, int]]:
+    """
+    Native table of contents as (level, title, unit) with 1-based units
+    matching extract_page_range(): PDF outline, EPUB nav, DOCX heading
+    styles. Empty when the document has none.
+    """
+    ext = pathlib.Path(path).suffix.lower()
+    try:
+        if ext == ".pdf" and PDF_AVAILABLE:
+            with fitz.open(path) as doc:
+                return [(lvl, title.strip(), max(page, 1)) for lvl, title, page, *_ in doc.get_toc()
+                        if title.strip()]
+        if ext == ".epub" and EPUB_AVAILABLE:
+            book  = epub.read_epub(path)
+            units = {item.get_name(): i for i, item in enumerate(_epub_documents(book), 1)}
+            return list(_walk_epub_toc(book.toc, units, 1))
+        if ext == ".docx" and DOCX_AVAILABLE:
+            toc = []
+            for para in DocxDocument(path).paragraphs:
+                style = para.style.name if para.style is not None else ""
+                m = re.match(r'(?:Heading\s*(\d)|Title)$', style)
+                if m and para.text.strip():
+                    toc.append((int(m.group(1) or 1), para.text.strip(), 1))
+            return toc
+    except Exception as e:
+        logger.warning(f"Outline extraction failed for {path}: {e}")
+    return []
+
+
+def _walk_epub_toc(entries, units: dict, level: int) -> Iterator[Tuple[int, str, int]]:
+    for entry in entries:
+        if isinstance(entry, (tuple, list)):
+            section, children = entry
+            if getattr(section, "title", None):
+                yield level, section.title.strip(), units.get((getattr(section, "href", "") or "").split("#")[0], 0)
+            yield from _walk_epub_toc(children, units, level + 1)
+        elif getattr(entry, "title", None):
+            yield level, entry.title.strip(), units.get(entry.href.split("#")[0], 0)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # TEXT CHUNKING
 # ─────────────────────────────────────────────────────────────────────────────
@@ -52,6 +246,31 @@ def chunk_text(text: str, words_per_chunk: int = 80) -> List[str]:
     return [c for c in chunks if c.strip()]
 
 
+class StreamChunker:
+    """
+    Incremental chunk_text() for page-by-page extraction. The last chunk
+    of each page is held back, since its sentence may continue on the
+    next page.
+    """
+
+    def __init__(self, words_per_chunk: int = 80):
+        self.words_per_chunk = words_per_chunk
+        self._tail = ""
+
+    def feed(self, text: str) -> List[str]:
+        chunks = chunk_text(f"{self._tail}\n{text}" if self._tail else text, self.words_per_chunk)
+        self._tail = chunks.pop() if chunks else self._tail
+        return chunks
+
+    @property
+    def has_tail(self) -> bool:
+        return bool(self._tail.strip())
+
+    def flush(self) -> List[str]:
+        tail, self._tail = self._tail, ""
+        return [tail] if tail.strip() else []
+
+
 def is_media_chunk(chunk: str) -> Tuple[bool, str]:
     """
     Detect if a chunk is a media placeholder.
@@ -79,9 +298,114 @@ def detect_heading(text: str) -> Optional[str]:
 # ─────────────────────────────────────────────────────────────────────────────
 # SIMPLE LOCAL SUMMARIZER
 # ─────────────────────────────────────────────────────────────────────────────
+_SENTENCE_RE = re.compile(r'[^.!?\n]+[.!?\n]+')
+_TERM_RE     = re.compile(r'[\w\u0900-\u0DFF]+')
+
+
+class TermStats:
+    """
+    One text tokenized once, keeping only the final scores: each
+    sentence's centrality (cosine similarity of its L2-normalised TF-IDF
+    row to the document centroid), the top keywords, and how many of
+    them each sentence contains. Needs NumPy. Term counts are sparse
+    (sentence, term) pairs, so memory grows with the text rather than
+    sentences × vocabulary. Text without sentence punctuation is treated
+    as one sentence.
+    """
+
+    TOP_KEYWORDS = 10
+
+    def __init__(self, text: str):
+        units = _SENTENCE_RE.findall(text) or [text]
+        vocab: dict = {}
+        rows, cols = [], []
+        for i, sent in enumerate(units):
+            for term in _TERM_RE.findall(sent.lower()):
+                if len(term) < 4 or term in STOP_WORDS or term.isdigit():
+                    continue
+                rows.append(i)
+                cols.append(vocab.setdefault(term, len(vocab)))
+        n, v = len(units), len(vocab)
+
+        # Distinct (sentence, term) pairs and their counts
+        width = max(v, 1)
+        pairs, counts = np.unique(np.asarray(rows, dtype=np.int64) * width
+                                  + np.asarray(cols, dtype=np.int64), return_counts=True)
+        rows, cols = pairs // width, pairs % width
+        tf = np.bincount(cols, weights=counts, minlength=v)
+
+        idf     = np.log((1 + n) / (1 + np.bincount(cols, minlength=v))) + 1.0
+        weights = counts * idf[cols]
+        norms   = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        weights /= norms[rows]  # every row with a pair has a non-zero norm
+        centroid = np.bincount(cols, weights=weights, minlength=v)
+        centroid = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.centrality = np.bincount(rows, weights=weights * centroid[cols], minlength=n)
+
+        # Most frequent terms, first occurrence breaking ties
+        top   = np.argsort(-tf, kind="stable")[:self.TOP_KEYWORDS]
+        terms = list(vocab)
+        self.top_terms = [terms[j] for j in top]
+        self.hits = np.bincount(rows[np.isin(cols, top)], minlength=n)
+
+    def keywords(self, top_n: int = 10) -> List[str]:
+        """Most frequent terms (at most TOP_KEYWORDS)."""
+        return self.top_terms[:top_n]
+
+    def keyword_hits(self) -> "np.ndarray":
+        """Per sentence: how many of the top keywords it contains."""
+        return self.hits
+
+
+_TERM_STATS: "OrderedDict[bytes, TermStats]" = OrderedDict()
+_TERM_STATS_SIZE = 32
+_term_stats_lock = threading.Lock()
+
+
+def term_stats(text: str) -> TermStats:
+    """
+    Memoized by a digest of the text, so summary + key points + keywords
+    tokenize once without the cache holding on to the text itself.
+    """
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _term_stats_lock:
+        stats = _TERM_STATS.get(key)
+        if stats is not None:
+            _TERM_STATS.move_to_end(key)
+            return stats
+    stats = TermStats(text)
+    with _term_stats_lock:
+        _TERM_STATS[key] = stats
+        while len(_TERM_STATS) > _TERM_STATS_SIZE:
+            _TERM_STATS.popitem(last=False)
+    return stats
+
+
+def clear_term_stats():
+    with _term_stats_lock:
+        _TERM_STATS.clear()
+
+
 def local_summarize(text: str, max_sentences: int = 3) -> str:
     """Extractive summary: pick most information-dense sentences."""
-    sentences = re.findall(r'[^.!?\n]+[.!?\n]+', text)
+    if not NUMPY_AVAILABLE:
+        return _local_summarize_basic(text, max_sentences)
+    sentences = _SENTENCE_RE.findall(text)
+    if not sentences:
+        return text[:400]
+    if len(sentences) <= max_sentences:
+        return text
+
+    # Centrality plus a lead / closing-sentence prior
+    scores = term_stats(text).centrality + 0.5
+    scores[0]  += 0.5
+    scores[-1] += 0.3
+    top = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+    return ' '.join(sentences[i].strip() for i in top)
+
+
+def _local_summarize_basic(text: str, max_sentences: int = 3) -> str:
+    sentences = _SENTENCE_RE.findall(text)
     if not sentences:
         return text[:400]
     if len(sentences) <= max_sentences:
@@ -115,36 +439,50 @@ def local_explain(text: str) -> str:
 
 def extract_key_points(text: str, max_points: int = 4) -> str:
     """Extract bullet-point style key points from text."""
-    sentences = re.findall(r'[^.!?\n]+[.!?\n]+', text)
-    keywords  = _extract_keywords(text)
-
-    scored = []
-    for sent in sentences:
-        score = sum(1 for kw in keywords if kw in sent.lower())
-        if score > 0:
-            scored.append((score, sent.strip()))
-
-    scored.sort(reverse=True)
-    points = [s[1] for s in scored[:max_points]]
+    if NUMPY_AVAILABLE:
+        sentences = _SENTENCE_RE.findall(text)
+        points    = []
+        if sentences:
+            stats = term_stats(text)
+            hits  = stats.keyword_hits()
+            # Most keywords first; centrality breaks ties
+            order  = np.lexsort((-stats.centrality, -hits))
+            points = [sentences[i].strip() for i in order[:max_points] if hits[i] > 0]
+    else:
+        sentences = _SENTENCE_RE.findall(text)
+        keywords  = _extract_keywords(text)
+
+        scored = []
+        for sent in sentences:
+            score = sum(1 for kw in keywords if kw in sent.lower())
+            if score > 0:
+                scored.append((score, sent.strip()))
+
+        scored.sort(reverse=True)
+        points = [s[1] for s in scored[:max_points]]
     if not points:
         points = [s.strip() for s in sentences[:max_points]]
 
     return '. '.join(f'Point {i+1}: {p}' for i, p in enumerate(points))
 
 
+STOP_WORDS = {
+    'the','a','an','is','are','was','were','be','been','being',
+    'have','has','had','do','does','did','will','would','shall',
+    'should','may','might','can','could','in','on','at','to',
+    'for','of','and','or','but','not','with','by','from','this',
+    'that','it','its','we','i','you','he','she','they','their',
+}
+
+
 def _extract_keywords(text: str, top_n: int = 10) -> List[str]:
     """Simple keyword extraction by term frequency (excluding stop words)."""
-    STOP = {
-        'the','a','an','is','are','was','were','be','been','being',
-        'have','has','had','do','does','did','will','would','shall',
-        'should','may','might','can','could','in','on','at','to',
-        'for','of','and','or','but','not','with','by','from','this',
-        'that','it','its','we','i','you','he','she','they','their',
-    }
+    if NUMPY_AVAILABLE:
+        return term_stats(text).keywords(top_n)
     words = re.findall(r'\b[a-z]{4,}\b', text.lower())
     freq  = {}
     for w in words:
-        if w not in STOP:
+        if w not in STOP_WORDS:
             freq[w] = freq.get(w, 0) + 1
     sorted_kw = sorted(freq, key=freq.get, reverse=True)
     return sorted_kw[:top_n]
@@ -175,8 +513,10 @@ def describe_media_local(media_type: str, context: str = "") -> str:
 # PROGRESS TRACKING
 # ─────────────────────────────────────────────────────────────────────────────
 class ReadingSession:
-    def __init__(self, chunks: List[str]):
-        self.chunks    = chunks
+    def __init__(self, chunks: List[str], outline=None, doc_id: str = ""):
+        self.chunks    = chunks   # list, or a ChunkIndex read lazily
+        self.outline   = outline  # Optional OutlineIndex for O(log n) chapter jumps
+        self.doc_id    = doc_id
         self.index     = 0
         self.paused    = False
         self.language  = "en"
@@ -204,9 +544,27 @@ class ReadingSession:
         self.index = max(self.index - 1, 0)
 
     def jump_to_chapter(self, keyword: str) -> bool:
+        if self.outline:
+            entry = self.outline.find(keyword)
+            if entry:
+                self.index = entry["chunk"]
+                return True
+            return False
         kw = keyword.lower()
         for i, chunk in enumerate(self.chunks):
             if kw in chunk.lower() and detect_heading(chunk):
                 self.index = i
                 return True
         return False
+
+    def next_chapter(self) -> bool:
+        entry = self.outline.next_after(self.index) if self.outline else None
+        if entry:
+            self.index = entry["chunk"]
+        return entry is not None
+
+    def previous_chapter(self) -> bool:
+        entry = self.outline.previous_before(self.index) if self.outline else None
+        if entry:
+            self.index = entry["chunk"]
+        return entry is not None
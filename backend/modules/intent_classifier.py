@@ -1,12 +1,13 @@
 """
 VOICE4BLIND — Intent Classifier
-Detects user intent from transcribed speech using pattern matching
-and optional embedding-based fallback.
+Detects user intent from transcribed speech using pattern matching,
+all rules compiled at import into one single-pass matcher, with a
+character n-gram scorer for ambiguous commands and near-misses.
 """
 
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 @dataclass
 class Intent:
@@ -67,45 +68,170 @@ LANG_PATTERNS = {
     "assamese":  [r'assamese', r'অসমীয়া'],
 }
 
-LANG_TRIGGERS = [
-    r'change', r'switch', r'speak in', r'in', r'language', r'bhasha',
-    r'mein', r'lo', r'madhye', r'il'
-]
+# Extra phrasings for the n-gram scorer, on top of the rule words
+INTENT_EXAMPLES = {
+    "greeting":   ["hi there", "hello there", "good morning"],
+    "start_read": ["read it", "read the document", "start reading the book", "read aloud"],
+    "pause":      ["stop reading", "pause reading", "wait a moment"],
+    "resume":     ["continue reading", "resume reading"],
+    "repeat":     ["repeat", "repeat that", "say that again", "read it again"],
+    "next":       ["next page", "skip this", "go forward"],
+    "prev":       ["go back", "previous page", "previous section"],
+    "slower":     ["read slowly", "read slower", "slow", "too fast"],
+    "faster":     ["read faster", "fast", "too slow", "quickly"],
+    "louder":     ["increase volume", "speak up", "i can't hear"],
+    "quieter":    ["decrease volume", "too loud", "speak softly"],
+    "summarize":  ["summarize this", "give me a summary", "make it short"],
+    "describe":   ["describe the image", "what is in the picture", "describe the chart"],
+}
+
+# Scorer similarity below which an utterance no rule matched stays "unknown"
+NGRAM_MIN_SCORE = 0.45
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COMPILED MATCHER
+# ─────────────────────────────────────────────────────────────────────────────
+# Every rule becomes one named branch of a single regex, in priority order
+# (languages first, then INTENT_RULES order). The alternation sits inside a
+# zero-width lookahead, so a scan tries every word start without consuming
+# text: at each start the highest-priority branch that matches there wins,
+# and the best over all starts is the rule the old "first rule that matches
+# anywhere" loop would have picked. Only word starts are tried — every
+# intent rule begins with \b anyway, and language names now have to begin
+# a word too (they may still run on: "hindime").
+
+def _branch(patterns) -> str:
+    # Inner groups become non-capturing so lastgroup names the rule
+    return '|'.join(re.sub(r'\((?!\?)', '(?:', p) for p in patterns)
+
+
+_RULES = (
+    [(f"lang_{lang}", Intent("change_language", 0.95, {"language": lang}))
+     for lang in LANG_PATTERNS]
+    + [(f"rule_{i}", Intent(name, 0.9)) for i, (name, _) in enumerate(INTENT_RULES)]
+)
+_PATTERNS = list(LANG_PATTERNS.values()) + [patterns for _, patterns in INTENT_RULES]
+_PRIORITY = {group: rank for rank, (group, _) in enumerate(_RULES)}
+_RESULT   = dict(_RULES)
+
+_MATCHER = re.compile(r'(?<!\w)(?=' + '|'.join(
+    f'(?P<{group}>{_branch(patterns)})' for (group, _), patterns in zip(_RULES, _PATTERNS)
+) + ')')
+
+
+# A scan reports one rule per word start. Rules that can match at the same
+# start as a higher-priority one ("start" / "start reading") are listed
+# here, found by matching every rule against every rule's own phrases, and
+# are re-checked only when their higher-priority neighbour fires.
+_SINGLE = [re.compile(_branch(patterns)) for patterns in _PATTERNS]
+
+
+def _rule_phrases(patterns) -> List[str]:
+    """r'\b(read|start reading)\b' → ['read', 'start reading']"""
+    phrases = []
+    for p in patterns:
+        body = re.sub(r'\\b|[()?:]', '', p).replace('.', ' ')
+        phrases += [w.strip() for w in body.split('|') if w.strip()]
+    return phrases
+
+
+def _overlaps() -> Dict[int, List[int]]:
+    overlaps: Dict[int, set] = {}
+    for probe in (ph for patterns in _PATTERNS for ph in _rule_phrases(patterns)):
+        hits = [r for r, rx in enumerate(_SINGLE) if rx.match(probe)]
+        for r in hits:
+            overlaps.setdefault(r, set()).update(h for h in hits if h > r)
+    return {r: sorted(others) for r, others in overlaps.items() if others}
+
+
+_OVERLAPS = _overlaps()
+
+
+def _rule_matches(t: str) -> Dict[int, int]:
+    """Priority → longest match length, for every rule matching the lowercased utterance."""
+    found: Dict[int, int] = {}
+    for m in _MATCHER.finditer(t):
+        rank  = _PRIORITY[m.lastgroup]
+        start = m.start()
+        found[rank] = max(found.get(rank, 0), m.end(rank + 1) - start)
+        for other in _OVERLAPS.get(rank, ()):
+            hit = _SINGLE[other].match(t, start)
+            if hit:
+                found[other] = max(found.get(other, 0), hit.end() - start)
+    return found
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# N-GRAM SCORER (optional: needs NumPy)
+# ─────────────────────────────────────────────────────────────────────────────
+def _examples() -> Dict[str, List[str]]:
+    # A rule word shared by several intents ("repeat" in deny and repeat)
+    # says nothing about which one is meant, so it feeds no centroid;
+    # INTENT_EXAMPLES can still give it to the intent it usually means.
+    owners: Dict[str, set] = {}
+    for name, patterns in INTENT_RULES:
+        for phrase in _rule_phrases(patterns):
+            owners.setdefault(phrase, set()).add(name)
+    examples: Dict[str, List[str]] = {}
+    for name, patterns in INTENT_RULES:
+        examples.setdefault(name, []).extend(
+            ph for ph in _rule_phrases(patterns) if len(owners[ph]) == 1)
+    for name, phrases in INTENT_EXAMPLES.items():
+        examples.setdefault(name, []).extend(phrases)
+    return examples
+
+
+try:
+    from .intent_scorer import NGramIntentScorer
+    SCORER: Optional["NGramIntentScorer"] = NGramIntentScorer(_examples())
+except ImportError:
+    SCORER = None
+
+
+def rank_intents(text: str, top: int = 3) -> List[Tuple[str, float]]:
+    """Scorer's top intents with similarities (empty without NumPy)."""
+    return SCORER.rank(text, top) if SCORER is not None else []
 
 
 def classify(text: str) -> Intent:
-    """Classify the intent of a transcribed voice command."""
+    """
+    Classify the intent of a transcribed voice command.
+
+    A language name wins outright. One matching intent is returned with
+    0.9 confidence. When rules for several intents match ("read slowly")
+    they are ranked by n-gram similarity plus the share of the utterance
+    their words cover, rule order breaking ties; when none match, the
+    scorer's best intent is used if it is close enough.
+    """
     t = text.lower().strip()
 
-    # 1. Check language change first
-    lang_intent = _detect_language_change(t)
-    if lang_intent:
-        return lang_intent
+    found = _rule_matches(t)
+    ranks = sorted(found)
+    if ranks and ranks[0] < len(LANG_PATTERNS):
+        hit = _RESULT[_RULES[ranks[0]][0]]
+        return Intent(hit.name, hit.confidence, dict(hit.payload))
 
-    # 2. Match rules
-    for intent_name, patterns in INTENT_RULES:
-        for pattern in patterns:
-            if re.search(pattern, t):
-                return Intent(name=intent_name, confidence=0.9)
+    # Intent → longest covered span, in rule order
+    covered: Dict[str, int] = {}
+    for r in ranks:
+        name = _RESULT[_RULES[r][0]].name
+        covered[name] = max(covered.get(name, 0), found[r])
+    if len(covered) == 1 or (covered and SCORER is None):
+        return Intent(name=next(iter(covered)), confidence=0.9)
+    if SCORER is None or not t:
+        return Intent(name="unknown", confidence=0.0)
 
+    scores = SCORER.scores(t)
+    if covered:
+        names = list(covered)
+        best  = max(names, key=lambda n: (SCORER.score(scores, n) + covered[n] / len(t), -names.index(n)))
+        return Intent(name=best, confidence=0.9)
+    i = int(scores.argmax())
+    if scores[i] >= NGRAM_MIN_SCORE:
+        return Intent(name=SCORER.intents[i], confidence=round(float(scores[i]), 3))
     return Intent(name="unknown", confidence=0.0)
 
 
-def _detect_language_change(text: str) -> Optional[Intent]:
-    """Detect language switch commands."""
-    has_trigger = any(re.search(p, text) for p in LANG_TRIGGERS)
-    for lang, patterns in LANG_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text):
-                # Language word found — accept even without explicit trigger
-                return Intent(
-                    name="change_language",
-                    confidence=0.95,
-                    payload={"language": lang}
-                )
-    return None
-
-
 def extract_username(text: str) -> str:
     """Extract username from 'username Harini' style input."""
     t = re.sub(r'\b(username|user name|my name is|name is|i am|iam|is|my|call me)\b', '', text, flags=re.I).strip()
@@ -0,0 +1,121 @@
+"""
+VOICE4BLIND — Intent Scorer
+Local, offline intent ranking: utterances become hashed character
+n-gram vectors and are compared with one centroid per intent. Character
+n-grams tolerate ASR slips ("sumarize", "pawse") and work the same for
+romanised Hindi/Kannada.
+"""
+
+import zlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Piece = Tuple[np.ndarray, np.ndarray]   # (bucket ids, their summed centroid rows)
+
+
+class NGramIntentScorer:
+    """
+    Centroids are the L2-normalised mean of each intent's example
+    vectors, a (dims × intents) float32 matrix; scores are cosine
+    similarities in [0, 1].
+
+    The n-grams of ' some words ' split into those inside each ' word '
+    and the few that cross each space between two words (exact for
+    n ≤ 4; longer n-grams that span a one-letter word are dropped). Both
+    kinds of piece are hashed and summed over the centroid rows once,
+    then cached, so scoring a new utterance is a sum of cached vectors
+    over one np.bincount norm; whole utterances are memoized too.
+    """
+
+    _MAX_MEMO = 50_000
+
+    def __init__(self, examples: Dict[str, Sequence[str]], dims: int = 4096,
+                 ngram_sizes: Tuple[int, ...] = (2, 3, 4)):
+        self.dims        = dims
+        self.ngram_sizes = ngram_sizes
+        self.intents: List[str] = list(examples)
+        self._row = {name: i for i, name in enumerate(self.intents)}
+        self._span = max(ngram_sizes) - 2          # chars kept each side of a space
+        self._words: Dict[str, Piece] = {}
+        self._joins: Dict[Tuple[str, str], Piece] = {}
+        self._scores: Dict[str, np.ndarray] = {}
+
+        centroids = np.zeros((dims, len(self.intents)), dtype=np.float32)
+        for i, name in enumerate(self.intents):
+            for example in examples[name]:
+                words = example.lower().split()
+                if words:
+                    counts = np.bincount(np.concatenate(
+                        [self._word_ids(w) for w in words]
+                        + [self._join_ids(self._join_key(a, b)) for a, b in zip(words, words[1:])]
+                    ), minlength=dims)
+                    centroids[:, i] += counts / np.sqrt(counts @ counts)
+            norm = np.linalg.norm(centroids[:, i])
+            if norm:
+                centroids[:, i] /= norm
+        self.centroids = centroids
+
+    # ── N-grams ──────────────────────────────────────────────────────────────
+    def _hash(self, grams) -> np.ndarray:
+        return np.array([zlib.crc32(g.encode("utf-8")) % self.dims for g in grams], dtype=np.intp)
+
+    def _word_ids(self, word: str) -> np.ndarray:
+        """Every n-gram of ' word ', one bucket per occurrence."""
+        padded = f" {word} "
+        return self._hash(padded[i:i + n] for n in self.ngram_sizes for i in range(len(padded) - n + 1))
+
+    def _join_key(self, left: str, right: str) -> Tuple[str, str]:
+        # The text either side of the space between two words that n-grams can reach
+        return f" {left}"[-self._span:], f"{right} "[:self._span]
+
+    def _join_ids(self, key: Tuple[str, str]) -> np.ndarray:
+        """N-grams of 'left right' with at least one character each side of the space."""
+        left, right = key
+        text, mid = f"{left} {right}", len(left)
+        return self._hash(text[i:i + n] for n in self.ngram_sizes
+                          for i in range(max(mid - n + 2, 0), min(mid, len(text) - n + 1)))
+
+    def _piece(self, cache: Dict[Any, Piece], key, ids_for) -> Piece:
+        piece = cache.get(key)
+        if piece is None:
+            if len(cache) > self._MAX_MEMO:
+                cache.clear()
+            ids   = ids_for(key)
+            piece = cache[key] = (ids, self.centroids[ids].sum(axis=0))
+        return piece
+
+    # ── Scoring ──────────────────────────────────────────────────────────────
+    def scores(self, text: str) -> np.ndarray:
+        """Similarity to every intent, in self.intents order (read-only)."""
+        key = " ".join(text.lower().split())
+        scores = self._scores.get(key)
+        if scores is not None:
+            return scores
+        words  = key.split()
+        pieces = [self._piece(self._words, w, self._word_ids) for w in words] + [
+            self._piece(self._joins, self._join_key(a, b), self._join_ids) for a, b in zip(words, words[1:])
+        ]
+        if not pieces:
+            scores = np.zeros(len(self.intents), dtype=np.float32)
+        else:
+            # Repeated buckets add up like counts, in the sum and in the norm
+            counts = np.bincount(np.concatenate([ids for ids, _ in pieces]))
+            scores = np.add.reduce([rows for _, rows in pieces]) / np.sqrt(counts @ counts)
+        scores.flags.writeable = False
+        if len(self._scores) > self._MAX_MEMO:
+            self._scores.clear()
+        self._scores[key] = scores
+        return scores
+
+    def clear(self):
+        """Forget memoized utterance scores (word pieces stay cached)."""
+        self._scores.clear()
+
+    def score(self, scores: np.ndarray, intent: str) -> float:
+        return float(scores[self._row[intent]])
+
+    def rank(self, text: str, top: int = 3) -> List[Tuple[str, float]]:
+        scores = self.scores(text)
+        order  = np.argsort(-scores, kind="stable")[:top]
+        return [(self.intents[i], round(float(scores[i]), 3)) for i in order]
@@ -0,0 +1,220 @@
+"""
+VOICE4BLIND — Background Jobs
+Long-running work (document ingestion) scheduled off the request path:
+a bounded queue drained by a fixed number of worker tasks, with
+per-job progress, cancellation, retry with backoff, and listeners that
+are told about every state/progress change (used to push /ws events).
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger("voice4blind.jobs")
+
+FINISHED = {"done", "failed", "cancelled"}
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    label: str = ""
+    status: str = "queued"          # queued | running | done | failed | cancelled
+    progress: float = 0.0           # 0–100
+    message: str = ""
+    attempts: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    _registry: Any = field(default=None, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id, "kind": self.kind, "label": self.label,
+            "status": self.status, "progress": round(self.progress, 1),
+            "message": self.message, "attempts": self.attempts,
+            "result": self.result, "error": self.error,
+            "created": self.created, "finished": self.finished,
+        }
+
+    def report(self, progress: float, message: str = ""):
+        """Update progress; listeners hear about whole-percent changes only."""
+        progress = max(0.0, min(progress, 100.0))
+        changed  = int(progress) != int(self.progress) or (message and message != self.message)
+        self.progress = progress
+        if message:
+            self.message = message
+        if changed and self._registry is not None:
+            self._registry._notify(self)
+
+
+Listener = Callable[[Job], None]
+
+
+class JobRegistry:
+    """
+    Keeps the most recent max_jobs jobs. Work is a coroutine function
+    taking the Job; its return value becomes job.result. Exceptions are
+    retried up to max_attempts times unless should_retry() says no.
+    """
+
+    def __init__(self, workers: int = 2, max_jobs: int = 500, max_queued: int = 100,
+                 max_attempts: int = 3, backoff: float = 1.0,
+                 should_retry: Callable[[Exception], bool] = lambda e: True):
+        self.workers      = workers
+        self.max_jobs     = max_jobs
+        self.max_queued   = max_queued
+        self.max_attempts = max_attempts
+        self.backoff      = backoff
+        self.should_retry = should_retry
+
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._work: Dict[str, Callable[[Job], Awaitable[Any]]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._listeners: Dict[str, Set[Listener]] = {}
+        self._global_listeners: Set[Listener] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._closing = False
+
+    # ── Submission ───────────────────────────────────────────────────────────
+    def start(self, kind: str, work: Callable[[Job], Awaitable[Any]], label: str = "") -> Job:
+        """Queue work(job); raises RuntimeError when the queue is full."""
+        self._ensure_workers()
+        if self._queue.qsize() >= self.max_queued:
+            raise RuntimeError("Too many documents are waiting to be processed.")
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, label=label, _registry=self)
+        self._jobs[job.id] = job
+        self._work[job.id] = work
+        self._trim()
+        self._queue.put_nowait(job.id)
+        self._notify(job)
+        return job
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _trim(self):
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].status in FINISHED:
+                self._forget(job_id)
+
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._work.pop(job_id, None)
+        self._listeners.pop(job_id, None)
+
+    # ── Execution ────────────────────────────────────────────────────────────
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is not None and job.status == "queued":
+                    task = asyncio.create_task(self._run(job))
+                    self._running[job.id] = task
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        # A cancelled job is routine; shutdown cancels the job
+                        # and the worker together, and must end the loop
+                        if not task.cancelled() or self._closing:
+                            raise
+                    finally:
+                        self._running.pop(job.id, None)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        work = self._work.pop(job.id)
+        while True:
+            job.attempts += 1
+            job.status = "running"
+            self._notify(job)
+            try:
+                job.result = await work(job)
+                job.progress, job.status = 100.0, "done"
+                break
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.error = getattr(e, "detail", None) or str(e)
+                if job.attempts >= self.max_attempts or not self.should_retry(e):
+                    logger.error(f"{job.kind} job {job.id} failed: {job.error}")
+                    job.status = "failed"
+                    break
+                delay = self.backoff * 2 ** (job.attempts - 1)
+                logger.warning(f"{job.kind} job {job.id} attempt {job.attempts} failed, retrying in {delay}s")
+                job.status, job.message = "queued", f"Retrying: {job.error}"
+                self._notify(job)
+                await asyncio.sleep(delay)
+            finally:
+                if job.status in FINISHED:
+                    job.finished = time.time()
+                    self._notify(job)
+
+    # ── Control / queries ────────────────────────────────────────────────────
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, limit: int = 50) -> List[Job]:
+        return list(self._jobs.values())[-limit:]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            job.status, job.finished = "cancelled", time.time()
+            self._work.pop(job_id, None)
+            self._notify(job)
+        return True
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        return {"queued": self.depth, "running": len(self._running), "tracked": len(self._jobs)}
+
+    async def shutdown(self):
+        self._closing = True
+        for task in list(self._running.values()) + self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ── Listeners ────────────────────────────────────────────────────────────
+    def subscribe(self, listener: Listener, job_id: Optional[str] = None):
+        """Listen to one job, or to every job when job_id is None."""
+        if job_id is None:
+            self._global_listeners.add(listener)
+        else:
+            self._listeners.setdefault(job_id, set()).add(listener)
+
+    def unsubscribe(self, listener: Listener):
+        self._global_listeners.discard(listener)
+        for listeners in self._listeners.values():
+            listeners.discard(listener)
+
+    def _notify(self, job: Job):
+        for listener in list(self._listeners.get(job.id, ())) + list(self._global_listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"Job listener error: {e}")
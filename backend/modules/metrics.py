@@ -0,0 +1,190 @@
+"""
+VOICE4BLIND — Metrics
+In-process timings and counters for the hot paths (page extraction,
+synthesis per backend, AI calls, /ws messages), exported in Prometheus
+text format. Timings keep a count, a sum and a window of recent samples
+for p50/p95/p99; gauges (queue depths, cache hit ratios) are read from
+existing stats() at scrape time, so they cost nothing in between.
+
+METRICS=0 turns recording into a no-op.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+PREFIX = "voice4blind_"
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+GaugeValue = Union[float, List[Tuple[Dict[str, str], float]]]
+
+# Per-request phase totals (name → seconds), set by the HTTP middleware
+REQUEST_PHASES: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+class _Samples:
+    __slots__ = ("count", "total", "recent")
+
+    def __init__(self, window: int):
+        self.count  = 0
+        self.total  = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+
+class _Timer:
+    """Context manager recording elapsed seconds into a registry."""
+
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "Registry", name: str, labels: dict):
+        self.registry = registry
+        self.name     = name
+        self.labels   = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    def __init__(self, enabled: bool = True, window: int = 1024):
+        self.enabled = enabled
+        self.window  = window
+        self._timings: Dict[Tuple[str, Labels], _Samples] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[str, Callable[[], GaugeValue]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # ── Recording ────────────────────────────────────────────────────────────
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            samples = self._timings.get(key)
+            if samples is None:
+                samples = self._timings[key] = _Samples(self.window)
+            samples.count += 1
+            samples.total += seconds
+            samples.recent.append(seconds)
+        phases = REQUEST_PHASES.get()
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    def timer(self, name: str, **labels):
+        """with METRICS.timer("tts_seconds", backend="gtts"): ..."""
+        return _Timer(self, name, labels) if self.enabled else _NULL_TIMER
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def gauge(self, name: str, read: Callable[[], GaugeValue], help: str = ""):
+        """read() → a number, or [(labels, value), …]; called at scrape time."""
+        self._gauges[name] = read
+        if help:
+            self._help[name] = help
+
+    def describe(self, name: str, help: str):
+        self._help[name] = help
+
+    # ── Worker processes ─────────────────────────────────────────────────────
+    def drain(self) -> dict:
+        """Everything recorded since the last drain, as picklable data."""
+        with self._lock:
+            data = {
+                "timings":  [(k, s.count, s.total, list(s.recent)) for k, s in self._timings.items()],
+                "counters": list(self._counters.items()),
+            }
+            self._timings.clear()
+            self._counters.clear()
+        return data
+
+    def merge(self, data: dict):
+        """Fold in what a worker process drained."""
+        with self._lock:
+            for key, count, total, recent in data["timings"]:
+                samples = self._timings.get(key)
+                if samples is None:
+                    samples = self._timings[key] = _Samples(self.window)
+                samples.count += count
+                samples.total += total
+                samples.recent.extend(recent)
+            for key, value in data["counters"]:
+                self._counters[key] = self._counters.get(key, 0.0) + value
+
+    # ── Export ───────────────────────────────────────────────────────────────
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            timings  = [(k, s.count, s.total, sorted(s.recent)) for k, s in self._timings.items()]
+            counters = list(self._counters.items())
+        lines: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {PREFIX}{name} {self._help[name]}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), count, total, recent in sorted(timings):
+            header(name, "summary")
+            for q in QUANTILES:
+                value = recent[min(int(q * len(recent)), len(recent) - 1)] if recent else 0.0
+                lines.append(f"{PREFIX}{name}{_labels(labels + (('quantile', str(q)),))} {value:.6g}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total:.6g}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters):
+            header(name, "counter")
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {value:g}")
+
+        for name, read in sorted(self._gauges.items()):
+            try:
+                value = read()
+            except Exception:
+                continue  # a broken gauge must not break the scrape
+            header(name, "gauge")
+            for labels, v in ([({}, value)] if isinstance(value, (int, float)) else value):
+                lines.append(f"{PREFIX}{name}{_labels(tuple(sorted(labels.items())))} {float(v):g}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Registry(enabled=os.environ.get("METRICS", "1").lower() not in ("0", "false", "no"))
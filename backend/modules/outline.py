@@ -0,0 +1,141 @@
+"""
+VOICE4BLIND — Outline Index
+Chapter / section table of contents mapped onto chunk positions, so
+"next chapter" and "go to chapter 3" are lookups instead of scans.
+"""
+
+import os
+import re
+import json
+import uuid
+import bisect
+import pathlib
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .document_processor import detect_heading
+
+NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+    'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+    'eleven': '11', 'twelve': '12', 'thirteen': '13', 'fourteen': '14',
+    'fifteen': '15', 'sixteen': '16', 'seventeen': '17', 'eighteen': '18',
+    'nineteen': '19', 'twenty': '20',
+    'first': '1', 'second': '2', 'third': '3', 'fourth': '4', 'fifth': '5',
+}
+
+
+def normalize_title(text: str) -> str:
+    """Lowercase, strip punctuation, spoken numbers → digits."""
+    words = re.findall(r'\w+', text.lower())
+    return ' '.join(NUMBER_WORDS.get(w, w) for w in words)
+
+
+class OutlineIndex:
+    """
+    Entries are dicts {title, level, page, chunk} sorted by chunk.
+    Title lookups go through a normalized-title dict and a word → entries
+    map; position lookups bisect the sorted chunk starts.
+    """
+
+    def __init__(self, entries: List[dict]):
+        self.entries = sorted(entries, key=lambda e: e["chunk"])
+        self._starts = [e["chunk"] for e in self.entries]
+        self._by_title: Dict[str, int] = {}
+        self._by_word:  Dict[str, Set[int]] = {}
+        for i, e in enumerate(self.entries):
+            norm = normalize_title(e["title"])
+            self._by_title.setdefault(norm, i)
+            for w in norm.split():
+                self._by_word.setdefault(w, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, query: str) -> Optional[dict]:
+        """Best entry for a spoken chapter name, e.g. 'chapter three'."""
+        norm = normalize_title(query)
+        if not norm:
+            return None
+        if norm in self._by_title:
+            return self.entries[self._by_title[norm]]
+        hits: Optional[Set[int]] = None
+        for w in norm.split():
+            ids  = self._by_word.get(w, set())
+            hits = ids if hits is None else hits & ids
+            if not hits:
+                break
+        if hits:
+            # Prefer the shortest matching title ("Chapter 3" over "Chapter 3 exercises")
+            return self.entries[min(hits, key=lambda i: (len(self.entries[i]["title"]), i))]
+        for e in self.entries:
+            if norm in normalize_title(e["title"]):
+                return e
+        return None
+
+    def current(self, chunk: int) -> Optional[dict]:
+        i = bisect.bisect_right(self._starts, chunk) - 1
+        return self.entries[i] if i >= 0 else None
+
+    def next_after(self, chunk: int, max_level: Optional[int] = None) -> Optional[dict]:
+        i = bisect.bisect_right(self._starts, chunk)
+        for e in self.entries[i:]:
+            if max_level is None or e["level"] <= max_level:
+                return e
+        return None
+
+    def previous_before(self, chunk: int, max_level: Optional[int] = None) -> Optional[dict]:
+        """Start of the current section, or the one before if already at its start."""
+        i = bisect.bisect_left(self._starts, chunk) - 1
+        for e in reversed(self.entries[:i + 1]):
+            if max_level is None or e["level"] <= max_level:
+                return e
+        return None
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+    def save(self, path: pathlib.Path):
+        """Atomic: readers see the old outline or the new one, never half of it."""
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "OutlineIndex":
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+
+def build_outline(toc: Sequence[Tuple[int, str, int]], pages: Sequence[str],
+                  chunk_pages: Sequence[int], chunk_texts: Sequence[str]) -> OutlineIndex:
+    """
+    Map (level, title, page) TOC entries onto chunk positions. Without a
+    native TOC, fall back to detect_heading() over each page's lines.
+    """
+    if not toc:
+        toc = [
+            (1, heading, page)
+            for page, text in enumerate(pages, 1)
+            for heading in filter(None, map(detect_heading, text.splitlines()))
+        ]
+
+    flat = [normalize_title(c) for c in chunk_texts]
+    entries: List[dict] = []
+    cursor = 0
+    for level, title, page in toc:
+        norm  = normalize_title(title)
+        # A page's first words can sit in the chunk carried over from the
+        # page before (StreamChunker), so the search starts one chunk early
+        start = max(bisect.bisect_left(chunk_pages, page) - 1, 0) if page else cursor
+        if entries and page and page >= entries[-1]["page"]:
+            start = max(start, cursor)
+        stop  = bisect.bisect_right(chunk_pages, page) if page else len(flat)
+        chunk = next((i for i in range(start, stop) if norm and norm in flat[i]), None)
+        if chunk is None:
+            if not page:
+                continue
+            chunk = min(bisect.bisect_left(chunk_pages, page), max(len(flat) - 1, 0))
+        page = page or (chunk_pages[chunk] if chunk < len(chunk_pages) else 1)
+        entries.append({"title": title, "level": level, "page": page, "chunk": chunk})
+        cursor = chunk
+    return OutlineIndex(entries)
@@ -0,0 +1,78 @@
+"""
+VOICE4BLIND — TTS Prefetch
+Per-session look-ahead: while chunk N is being read aloud, chunks
+N+1 … N+ahead are synthesized so every chunk boundary is a cache hit.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from .worker_pool import PoolBusyError
+
+logger = logging.getLogger("voice4blind.prefetch")
+
+Synth = Callable[[str, str, float], Awaitable[Optional[bytes]]]
+
+
+class TTSPrefetcher:
+    """
+    Tracks one listener's position. Moving forward keeps in-flight work
+    for chunks still ahead; a seek cancels work outside the new window;
+    a document / language / rate change cancels everything.
+    """
+
+    def __init__(self, synth: Synth, ahead: int = 3):
+        self.synth = synth
+        self.ahead = ahead
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._context: Optional[Tuple[str, str, float]] = None
+        self._chunks: Sequence[str] = ()
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, doc_id: str, chunks: Sequence[str], position: int, lang: str, rate: float):
+        """Listener is now at `position`; (re)schedule the look-ahead window."""
+        context = (doc_id, lang, round(rate, 2))
+        if context != self._context:
+            self.cancel()
+            self._context = context
+        self._chunks = chunks
+
+        window = range(position + 1, min(position + 1 + self.ahead, len(chunks)))
+        for i in [i for i in self._tasks if i not in window and i != position]:
+            self._tasks.pop(i).cancel()
+        for i in window:
+            if i not in self._tasks:
+                self._tasks[i] = asyncio.create_task(self._prefetch(chunks[i], lang, rate))
+
+    async def _prefetch(self, text: str, lang: str, rate: float) -> Optional[bytes]:
+        try:
+            return await self.synth(text, lang, rate)
+        except (PoolBusyError, asyncio.TimeoutError):
+            return None  # best effort — playback will synthesize on demand
+        except Exception as e:
+            logger.error(f"Prefetch failed: {e}")
+            return None
+
+    async def audio_for(self, doc_id: str, index: int, text: str, lang: str, rate: float) -> Optional[bytes]:
+        """
+        Audio for the chunk about to play, joining an in-flight prefetch if
+        any. Call update() first so the next window starts in parallel.
+        """
+        task = self._tasks.pop(index, None)
+        if task is not None and self._context == (doc_id, lang, round(rate, 2)):
+            audio = await asyncio.shield(task)
+            if audio is not None:
+                self.hits += 1
+                return audio
+        self.misses += 1
+        return await self.synth(text, lang, rate)
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._tasks), "hits": self.hits, "misses": self.misses}
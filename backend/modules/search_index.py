@@ -0,0 +1,160 @@
+"""
+VOICE4BLIND — Search Index
+Incremental inverted index over document chunks (token → chunk postings)
+with BM25 ranking, for "find where photosynthesis is explained".
+
+Each document is one gzip'd segment on disk, so indexing an upload
+never rewrites the rest of the library.
+"""
+
+import os
+import re
+import gzip
+import json
+import math
+import uuid
+import heapq
+import logging
+import pathlib
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from .document_processor import STOP_WORDS
+
+logger = logging.getLogger("voice4blind.search")
+
+# \w alone splits Indic words at combining vowel signs
+_TOKEN_RE = re.compile(r'[\w\u0900-\u0DFF]+')
+
+BM25_K1 = 1.2
+BM25_B  = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    In memory: term → {doc_id: array('I') of (chunk, tf) pairs} and per-doc
+    chunk lengths. On disk: one <doc_id>.json.gz segment per document.
+    """
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._postings: Dict[str, Dict[str, array]] = {}
+        self._lengths:  Dict[str, array] = {}
+        self._names:    Dict[str, str] = {}
+        self._terms:    Dict[str, List[str]] = {}
+        self._total_chunks = 0
+        self._total_tokens = 0
+        self._lock = threading.Lock()
+        for seg in self.directory.glob("*.json.gz"):
+            try:
+                self._load_segment(seg)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping corrupt search segment {seg.name}: {e}")
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    # ── Indexing ─────────────────────────────────────────────────────────────
+    def add_document(self, doc_id: str, filename: str, chunks: Iterable[str]):
+        """(Re)index a document's chunks and persist its segment."""
+        postings: Dict[str, List[int]] = {}
+        lengths = array("I")
+        for i, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).extend((i, tf))
+
+        segment = {"doc_id": doc_id, "filename": filename,
+                   "lengths": lengths.tolist(), "postings": postings}
+        path = self.directory / f"{doc_id}.json.gz"
+        tmp  = path.with_name(f".{doc_id}.{uuid.uuid4().hex}.tmp")   # concurrent indexers never share one
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(segment, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._install(segment)
+        logger.info(f"Search-indexed {filename}: {len(postings)} terms, {len(lengths)} chunks")
+
+    def remove_document(self, doc_id: str):
+        with self._lock:
+            self._drop(doc_id)
+        try:
+            (self.directory / f"{doc_id}.json.gz").unlink()
+        except OSError:
+            pass
+
+    def _load_segment(self, path: pathlib.Path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self._install(json.load(f))
+
+    def _install(self, segment: dict):
+        doc_id = segment["doc_id"]
+        with self._lock:
+            self._drop(doc_id)
+            lengths = array("I", segment["lengths"])
+            self._lengths[doc_id] = lengths
+            self._names[doc_id]   = segment.get("filename", "")
+            self._terms[doc_id]   = list(segment["postings"])
+            self._total_chunks   += len(lengths)
+            self._total_tokens   += sum(lengths)
+            for term, flat in segment["postings"].items():
+                self._postings.setdefault(term, {})[doc_id] = array("I", flat)
+
+    def _drop(self, doc_id: str):
+        lengths = self._lengths.pop(doc_id, None)
+        if lengths is None:
+            return
+        self._names.pop(doc_id, None)
+        self._total_chunks -= len(lengths)
+        self._total_tokens -= sum(lengths)
+        for term in self._terms.pop(doc_id, []):
+            docs = self._postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self._postings[term]
+
+    # ── Querying ─────────────────────────────────────────────────────────────
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Top chunks by BM25: [{doc_id, filename, chunk, score}]."""
+        terms = set(tokenize(query))
+        scores: Dict[Tuple[str, int], float] = {}
+        with self._lock:
+            n = self._total_chunks
+            if not n or not terms:
+                return []
+            avg_len = self._total_tokens / n or 1.0
+            for term in terms:
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                df  = sum(len(flat) // 2 for flat in docs.values())
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for doc_id, flat in docs.items():
+                    lengths = self._lengths[doc_id]
+                    for j in range(0, len(flat), 2):
+                        chunk, tf = flat[j], flat[j + 1]
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[chunk] / avg_len)
+                        key  = (doc_id, chunk)
+                        scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            names = dict(self._names)
+        top = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+        return [
+            {"doc_id": doc_id, "filename": names.get(doc_id, ""), "chunk": chunk, "score": round(score, 4)}
+            for (doc_id, chunk), score in top
+        ]
+
+    def stats(self) -> dict:
+        return {"documents": len(self._lengths), "chunks": self._total_chunks, "terms": len(self._postings)}
@@ -0,0 +1,186 @@
+"""
+VOICE4BLIND — Reading Sessions
+Where each listener is in each book, kept server-side so a dropped
+connection or page reload resumes with one small message instead of a
+document reload. Sessions are keyed by user + document, live in memory
+while in use, are snapshotted to disk periodically, and are evicted
+from memory once idle (the snapshot stays on disk).
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import pathlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("voice4blind.sessions")
+
+Key = Tuple[str, str]   # (user, doc_id)
+
+
+class SessionState:
+    """One listener's place in one document; small enough to keep thousands."""
+
+    __slots__ = ("user", "doc_id", "index", "rate", "pitch", "language", "bookmarks", "touched")
+
+    def __init__(self, user: str, doc_id: str, index: int = 0, rate: float = 1.0,
+                 pitch: float = 1.0, language: str = "en", bookmarks: Optional[List[list]] = None,
+                 touched: float = 0.0):
+        self.user      = user
+        self.doc_id    = doc_id
+        self.index     = index
+        self.rate      = rate
+        self.pitch     = pitch
+        self.language  = language
+        self.bookmarks = bookmarks or []   # [[chunk index, label], …] sorted by index
+        self.touched   = touched or time.time()
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionState":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+class SessionStore:
+    """
+    One JSON file per session under directory/<user>/<doc>.json (both
+    names hashed, so client-supplied ids never become paths). Only
+    sessions changed since the last snapshot are written.
+    """
+
+    def __init__(self, directory: pathlib.Path, idle_seconds: float = 1800,
+                 snapshot_seconds: float = 30):
+        self.directory        = pathlib.Path(directory)
+        self.idle_seconds     = idle_seconds
+        self.snapshot_seconds = snapshot_seconds
+        self._live: Dict[Key, SessionState] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()   # snapshots run in a worker thread
+        self.loads = self.writes = self.evictions = 0
+
+    @staticmethod
+    def _name(value: str) -> str:
+        return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, user: str, doc_id: str) -> pathlib.Path:
+        return self.directory / self._name(user) / f"{self._name(doc_id)}.json"
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+    def get(self, user: str, doc_id: str) -> Optional[SessionState]:
+        """Live session, else the last snapshot, else None."""
+        key = (user, doc_id)
+        with self._lock:
+            state = self._live.get(key)
+        if state is None:
+            state = self._read(self._path(user, doc_id))
+            if state is not None:
+                with self._lock:
+                    state = self._live.setdefault(key, state)
+        if state is not None:
+            state.touched = time.time()
+        return state
+
+    def latest(self, user: str) -> Optional[SessionState]:
+        """The user's most recently used session, live or on disk."""
+        with self._lock:
+            live = [s for (u, _), s in self._live.items() if u == user]
+        best = max(live, key=lambda s: s.touched, default=None)
+        try:
+            files = sorted((self.directory / self._name(user)).glob("*.json"),
+                           key=lambda p: p.stat().st_mtime, reverse=True)
+        except OSError:
+            files = []
+        if files and (best is None or files[0].stat().st_mtime > best.touched):
+            on_disk = self._read(files[0])
+            if on_disk is not None:
+                with self._lock:
+                    best = self._live.setdefault((user, on_disk.doc_id), on_disk)
+                best.touched = time.time()
+        return best
+
+    def _read(self, path: pathlib.Path) -> Optional[SessionState]:
+        try:
+            state = SessionState.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.error(f"Unreadable session snapshot {path.name}: {e}")
+            return None
+        self.loads += 1
+        return state
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+    def update(self, user: str, doc_id: str, **fields) -> SessionState:
+        """Set any of index / rate / pitch / language, creating the session if needed."""
+        state = self.get(user, doc_id)
+        with self._lock:
+            if state is None:
+                state = self._live.setdefault((user, doc_id), SessionState(user, doc_id))
+            for name, value in fields.items():
+                setattr(state, name, value)
+            state.touched = time.time()
+            self._dirty.add((user, doc_id))
+        return state
+
+    def add_bookmark(self, user: str, doc_id: str, index: int, label: str = "") -> SessionState:
+        state = self.get(user, doc_id) or self.update(user, doc_id)
+        with self._lock:
+            marks = [m for m in state.bookmarks if m[0] != index] + [[index, label]]
+            state.bookmarks = sorted(marks, key=lambda m: m[0])
+            state.touched = time.time()
+            self._dirty.add((user, doc_id))
+        return state
+
+    # ── Snapshots / eviction ─────────────────────────────────────────────────
+    def snapshot(self) -> int:
+        """Write every session changed since the last snapshot. Blocking."""
+        with self._lock:
+            pending = [(key, self._live[key].to_dict()) for key in self._dirty if key in self._live]
+            self._dirty.clear()
+        for (user, doc_id), data in pending:
+            path = self._path(user, doc_id)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.error(f"Could not snapshot session: {e}")
+                with self._lock:
+                    self._dirty.add((user, doc_id))
+                continue
+            self.writes += 1
+        return len(pending)
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle past idle_seconds; unsaved ones wait for a snapshot."""
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            idle = [k for k, s in self._live.items() if s.touched < cutoff and k not in self._dirty]
+            for key in idle:
+                del self._live[key]
+        self.evictions += len(idle)
+        return len(idle)
+
+    async def run(self):
+        """Snapshot and evict every snapshot_seconds until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self.snapshot_seconds)
+                await asyncio.to_thread(self.snapshot)
+                self.evict_idle()
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.snapshot)
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "live": len(self._live), "unsaved": len(self._dirty),
+            "loads": self.loads, "writes": self.writes, "evictions": self.evictions,
+        }
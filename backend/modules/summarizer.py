@@ -0,0 +1,147 @@
+"""
+VOICE4BLIND — Document Summarizer
+Whole-document / chapter summaries by map-reduce over the chunk index:
+fixed blocks of chunks are summarized concurrently (map), then the
+partial summaries are summarized in groups until one remains (reduce).
+
+Block summaries are aligned to fixed chunk boundaries and persisted
+next to the index (summaries.json), so a chapter summary after a book
+summary only pays for the partial blocks at the chapter's edges. A step
+whose summarize() call fails uses the fallback for this answer only:
+it is never persisted, and the result is marked degraded.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .chunk_index import ChunkIndex
+
+logger = logging.getLogger("voice4blind.summarizer")
+
+Summarize = Callable[[str, str], Awaitable[str]]
+
+
+class DocumentSummarizer:
+    """
+    summarize(text, language) does the actual work and raises when it
+    fails; tag identifies it so summaries from one engine are never
+    served for another. fallback(text, language), if given, stands in
+    for a failed step. block_chars / reduce_chars keep every call inside
+    the summarizer's input window.
+    """
+
+    def __init__(self, summarize: Summarize, tag: str, fallback: Optional[Summarize] = None,
+                 concurrency: int = 4, block_chars: int = 2800, reduce_chars: int = 2800):
+        self.summarize    = summarize
+        self.tag          = tag
+        self.fallback     = fallback
+        self.concurrency  = concurrency
+        self.block_chars  = block_chars
+        self.reduce_chars = reduce_chars
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def block_size(self, index: ChunkIndex) -> int:
+        """Chunks per map block (≈ 6 chars per word)."""
+        return max(1, self.block_chars // (6 * index.words_per_chunk))
+
+    async def summarize_range(self, index: ChunkIndex, start: int, stop: int,
+                              language: str = "en") -> dict:
+        """Summary of chunks [start, stop), how much work was reused, and whether any step fell back."""
+        start = max(0, start)
+        stop  = min(stop, len(index))
+        if start >= stop:
+            return {"summary": "", "blocks": 0, "reused": 0, "degraded": False}
+
+        size   = self.block_size(index)
+        blocks = [(b, min(b - b % size + size, stop)) for b in self._block_starts(start, stop, size)]
+        stored = await asyncio.to_thread(self._load, index)
+        keys   = [self._key(index, language, b, e) for b, e in blocks]
+        todo   = [(k, b, e) for k, (b, e) in zip(keys, blocks) if k not in stored]
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def map_block(b: int, e: int) -> Tuple[str, bool]:
+            async with slots:
+                text = " ".join(await asyncio.to_thread(index.texts, b, e))
+                return await self._step(text, language)
+
+        fresh = await asyncio.gather(*(map_block(b, e) for _, b, e in todo))
+        good  = {k: summary for (k, _, _), (summary, ok) in zip(todo, fresh) if ok}
+        if good:
+            await self._store(index, good)
+        parts = {**stored, **{k: summary for (k, _, _), (summary, _) in zip(todo, fresh)}}
+
+        summary, reduced = await self._reduce([parts[k] for k in keys if parts[k]], language, slots)
+        return {
+            "summary": summary, "blocks": len(blocks), "reused": len(blocks) - len(todo),
+            "degraded": not reduced or len(good) < len(todo),
+        }
+
+    async def _step(self, text: str, language: str) -> Tuple[str, bool]:
+        """(summary, True), or the fallback's (summary, False) when summarize() fails."""
+        try:
+            return await self.summarize(text, language), True
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Summary step failed, using fallback: {e}")
+            return await self.fallback(text, language), False
+
+    @staticmethod
+    def _block_starts(start: int, stop: int, size: int) -> List[int]:
+        # First block may be partial; the rest start on multiples of size
+        return [start] + list(range(start - start % size + size, stop, size))
+
+    async def _reduce(self, parts: List[str], language: str,
+                      slots: asyncio.Semaphore) -> Tuple[str, bool]:
+        """Combined summary, and False if any reduce step fell back."""
+        if not parts:
+            return "", True
+        ok = True
+        while len(parts) > 1:
+            groups, group, length = [], [], 0
+            for part in parts:
+                if group and length + len(part) > self.reduce_chars:
+                    groups.append(group)
+                    group, length = [], 0
+                group.append(part)
+                length += len(part) + 1
+            groups.append(group)
+            if len(groups) == len(parts):  # parts too long to combine — pair them up
+                groups = [parts[i:i + 2] for i in range(0, len(parts), 2)]
+
+            async def reduce_group(group: List[str]) -> Tuple[str, bool]:
+                async with slots:
+                    return await self._step(" ".join(group), language)
+
+            results = await asyncio.gather(*(reduce_group(g) for g in groups))
+            parts = [summary for summary, _ in results]
+            ok = ok and all(step_ok for _, step_ok in results)
+        return parts[0], ok
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+    def _key(self, index: ChunkIndex, language: str, start: int, stop: int) -> str:
+        # Chunk boundaries depend on the index version and chunk size
+        return f"{self.tag}:v{index.version}/{index.words_per_chunk}:{language}:{start}-{stop}"
+
+    def _load(self, index: ChunkIndex) -> Dict[str, str]:
+        try:
+            return json.loads((index.directory / "summaries.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    async def _store(self, index: ChunkIndex, new: Dict[str, str]):
+        lock = self._locks.setdefault(index.doc_id, asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._merge, index, new)
+
+    def _merge(self, index: ChunkIndex, new: Dict[str, str]):
+        summaries = {**self._load(index), **new}
+        path = index.directory / "summaries.json"
+        tmp  = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(summaries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        logger.info(f"Stored {len(new)} block summaries for {index.filename or index.doc_id}")
@@ -6,9 +6,18 @@ Falls back gracefully based on available libraries.
 
 import os
 import io
+import re
+import asyncio
+import hashlib
 import logging
+import pathlib
 import tempfile
-from typing import Optional
+import threading
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+from .cache import DiskLRUCache
+from .metrics import METRICS
+from .worker_pool import WorkerPool
 
 logger = logging.getLogger("voice4blind.tts")
 
@@ -32,13 +41,32 @@ except ImportError:
 # ─────────────────────────────────────────────────────────────────────────────
 # pyttsx3 (offline TTS)
 # ─────────────────────────────────────────────────────────────────────────────
+# Engines are not thread-safe, so each synthesis worker owns one
+# (created lazily on first use) instead of sharing a module global.
+# If an engine cannot start (no eSpeak / speech driver on this host), no
+# later one will either: pyttsx3 is then reported unavailable for good.
 try:
     import pyttsx3
-    _pyttsx3_engine = pyttsx3.init()
     PYTTSX3_AVAILABLE = True
 except Exception:
     PYTTSX3_AVAILABLE = False
 
+_worker_state = threading.local()
+
+
+def _pyttsx3_engine():
+    global PYTTSX3_AVAILABLE
+    engine = getattr(_worker_state, "pyttsx3", None)
+    if engine is None:
+        try:
+            engine = _worker_state.pyttsx3 = pyttsx3.Engine()
+        except Exception as e:
+            if PYTTSX3_AVAILABLE:
+                PYTTSX3_AVAILABLE = False
+                logger.warning(f"pyttsx3 disabled, engine failed to start: {e}")
+            raise
+    return engine
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Azure Neural TTS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -52,6 +80,27 @@ if AZURE_AVAILABLE:
     except ImportError:
         AZURE_AVAILABLE = False
 
+_azure_config = None
+_azure_config_lock = threading.Lock()
+
+
+def _azure_synthesizer():
+    """
+    One SpeechConfig per process, one SpeechSynthesizer per worker thread
+    (synthesizers are not thread-safe). The synthesizer's service
+    connection is opened on creation and reused for every call.
+    """
+    global _azure_config
+    synth = getattr(_worker_state, "azure", None)
+    if synth is None:
+        with _azure_config_lock:
+            if _azure_config is None:
+                _azure_config = speechsdk.SpeechConfig(subscription=AZURE_KEY, region=AZURE_REGION)
+        synth = speechsdk.SpeechSynthesizer(speech_config=_azure_config, audio_config=None)
+        speechsdk.Connection.from_speech_synthesizer(synth).open(True)
+        _worker_state.azure = synth
+    return synth
+
 # Azure voice map
 AZURE_VOICES = {
     "en-US": "en-US-JennyNeural",
@@ -68,30 +117,242 @@ AZURE_VOICES = {
 }
 
 
-def synthesize(text: str, lang: str = "en", rate: float = 1.0) -> Optional[bytes]:
+# ─────────────────────────────────────────────────────────────────────────────
+# Audio cache — repeats and fixed prompts skip synthesis entirely
+# ─────────────────────────────────────────────────────────────────────────────
+_CACHE_DIR = pathlib.Path(os.environ.get("CACHE_DIR", pathlib.Path(__file__).parent.parent / "cache"))
+
+AUDIO_CACHE = DiskLRUCache(
+    _CACHE_DIR / "tts",
+    max_disk_bytes=int(os.environ.get("TTS_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+    max_memory_items=int(os.environ.get("TTS_CACHE_MEMORY_ITEMS", "256")),
+    max_memory_bytes=32 * 1024 * 1024,
+    suffix=".audio",
+)
+
+
+def voice_for(lang: str) -> str:
+    """Identity of the voice the first available backend would use."""
+    lang_code = lang.split("-")[0].lower()
+    if AZURE_AVAILABLE:
+        return "azure:" + AZURE_VOICES.get(lang, AZURE_VOICES["en-US"])
+    if GTTS_AVAILABLE:
+        return "gtts:" + LANG_CODES.get(lang_code, "en")
+    if PYTTSX3_AVAILABLE:
+        return "pyttsx3"
+    return ""
+
+
+def cache_key(text: str, lang: str, rate: float, voice: str) -> str:
+    normalized = re.sub(r'\s+', ' ', text).strip()
+    raw = f"{normalized}\x00{lang}\x00{voice}\x00{round(rate, 2)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def synthesize(text: str, lang: str = "en", rate: float = 1.0, use_cache: bool = True) -> Optional[bytes]:
     """
     Convert text to speech audio bytes (MP3 or WAV).
     Returns None if synthesis is unavailable (use browser TTS).
     """
+    voice = voice_for(lang)
+    key   = cache_key(text, lang, rate, voice)
+    if use_cache and voice:
+        audio = AUDIO_CACHE.get(key)
+        if audio is not None:
+            return audio
+
+    audio, used = _synthesize_uncached(text, lang, rate)
+    # Only cache what the preferred voice produced, not degraded fallbacks
+    if use_cache and audio and used == voice:
+        AUDIO_CACHE.put(key, audio)
+    return audio
+
+
+def _synthesize_uncached(text: str, lang: str, rate: float) -> Tuple[Optional[bytes], str]:
     lang_code = lang.split("-")[0].lower()
 
     # 1. Azure (best quality)
     if AZURE_AVAILABLE:
-        audio = _azure_tts(text, lang, rate)
+        with METRICS.timer("tts_synthesize_seconds", backend="azure"):
+            audio = _azure_tts(text, lang, rate)
         if audio:
-            return audio
+            return audio, "azure:" + AZURE_VOICES.get(lang, AZURE_VOICES["en-US"])
+        METRICS.inc("tts_backend_failures_total", backend="azure")
 
     # 2. gTTS (good quality, requires internet)
     if GTTS_AVAILABLE:
-        audio = _gtts_tts(text, LANG_CODES.get(lang_code, "en"))
+        gtts_lang = LANG_CODES.get(lang_code, "en")
+        with METRICS.timer("tts_synthesize_seconds", backend="gtts"):
+            audio = _gtts_tts(text, gtts_lang)
         if audio:
-            return audio
+            return audio, "gtts:" + gtts_lang
+        METRICS.inc("tts_backend_failures_total", backend="gtts")
 
     # 3. pyttsx3 (offline fallback — limited language support)
     if PYTTSX3_AVAILABLE:
-        return _pyttsx3_tts(text, rate)
+        with METRICS.timer("tts_synthesize_seconds", backend="pyttsx3"):
+            audio = _pyttsx3_tts(text, rate)
+        if not audio:
+            METRICS.inc("tts_backend_failures_total", backend="pyttsx3")
+        return audio, "pyttsx3"
+
+    return None, ""
+
+
+def cache_stats() -> dict:
+    return AUDIO_CACHE.stats()
+
+
+def audio_mime(audio: bytes) -> str:
+    return "audio/wav" if audio[:4] == b"RIFF" else "audio/mpeg"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Streaming synthesis — first audio within one sentence / one Azure block
+# ─────────────────────────────────────────────────────────────────────────────
+STREAM_BLOCK_BYTES = 16 * 1024
+
+# Frames are (mime, standalone, data). standalone=True means the frame is a
+# complete, independently playable file (one sentence); False means frames
+# are consecutive pieces of a single audio stream.
+AudioFrame = Tuple[str, bool, bytes]
+
+
+def split_sentences(text: str) -> List[str]:
+    # । is the Devanagari full stop
+    return [s for s in re.split(r'(?<=[.!?।])\s+', text.strip()) if s.strip()]
+
+
+def synthesize_stream(text: str, lang: str = "en", rate: float = 1.0) -> Iterator[AudioFrame]:
+    """
+    Streaming counterpart of synthesize(): Azure streams its output,
+    gTTS and pyttsx3 synthesize sentence by sentence. Complete Azure /
+    gTTS results are written to the audio cache for later replays.
+    """
+    voice = voice_for(lang)
+    key   = cache_key(text, lang, rate, voice)
+    cached = AUDIO_CACHE.get(key) if voice else None
+    if cached is not None:
+        for i in range(0, len(cached), STREAM_BLOCK_BYTES):
+            yield audio_mime(cached), False, cached[i:i + STREAM_BLOCK_BYTES]
+        return
+
+    lang_code = lang.split("-")[0].lower()
+
+    # 1. Azure — true streaming output
+    if AZURE_AVAILABLE:
+        parts = []
+        for block in _azure_tts_stream(text, lang, rate):
+            parts.append(block)
+            yield "audio/wav", False, block
+        if parts:
+            if voice.startswith("azure:"):
+                AUDIO_CACHE.put(key, b"".join(parts))
+            return
+
+    # 2. gTTS — one MP3 per sentence (MP3 segments concatenate cleanly)
+    if GTTS_AVAILABLE:
+        gtts_lang = LANG_CODES.get(lang_code, "en")
+        sentences = split_sentences(text)
+        parts = []
+        for sentence in sentences:
+            audio = _gtts_tts(sentence, gtts_lang)
+            if not audio:
+                break
+            parts.append(audio)
+            yield "audio/mpeg", True, audio
+        if parts:
+            if len(parts) == len(sentences) and voice == "gtts:" + gtts_lang:
+                AUDIO_CACHE.put(key, b"".join(parts))
+            return
+
+    # 3. pyttsx3 — one WAV per sentence (not cached: WAVs don't concatenate)
+    if PYTTSX3_AVAILABLE:
+        for sentence in split_sentences(text):
+            audio = _pyttsx3_tts(sentence, rate)
+            if audio:
+                yield "audio/wav", True, audio
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Async service — synthesis runs in a bounded worker pool
+# ─────────────────────────────────────────────────────────────────────────────
+TTS_POOL = WorkerPool(
+    "tts",
+    kind="thread",
+    max_workers=int(os.environ.get("TTS_WORKERS", "4")),
+    max_pending=int(os.environ.get("TTS_MAX_PENDING", "0")) or None,
+    timeout=float(os.environ.get("TTS_TIMEOUT", "30")),
+)
+
 
-    return None
+async def synthesize_async(text: str, lang: str = "en", rate: float = 1.0) -> Optional[bytes]:
+    """
+    synthesize() without blocking the event loop. Cache hits never queue
+    behind in-flight synthesis. Raises PoolBusyError / asyncio.TimeoutError.
+    """
+    voice = voice_for(lang)
+    if voice:
+        audio = await asyncio.to_thread(AUDIO_CACHE.get, cache_key(text, lang, rate, voice))
+        if audio is not None:
+            return audio
+    return await TTS_POOL.run(synthesize, text, lang, rate)
+
+
+def _warm_up():
+    if AZURE_AVAILABLE:
+        _azure_synthesizer()
+    if PYTTSX3_AVAILABLE:
+        try:
+            _pyttsx3_engine()
+        except Exception:
+            pass  # logged, and pyttsx3 is now marked unavailable
+
+
+async def warm_up():
+    """Create the engines / open the Azure connection before the first request."""
+    try:
+        await TTS_POOL.run(_warm_up)
+    except Exception as e:
+        logger.warning(f"TTS warm-up failed: {e}")
+
+
+async def synthesize_stream_async(text: str, lang: str = "en", rate: float = 1.0) -> AsyncIterator[AudioFrame]:
+    """
+    synthesize_stream() run in a pool worker, frames handed back to the
+    event loop as they are produced. Closing the iterator stops the worker
+    at the next frame. Raises PoolBusyError / asyncio.TimeoutError.
+    """
+    loop  = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop  = threading.Event()
+
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def pump():
+        try:
+            for frame in synthesize_stream(text, lang, rate):
+                if stop.is_set():
+                    return
+                post(frame)
+        except Exception as e:
+            logger.error(f"Streaming TTS error: {e}")
+        finally:
+            post(None)
+
+    TTS_POOL.submit(pump)
+    try:
+        while True:
+            frame = await asyncio.wait_for(queue.get(), TTS_POOL.timeout)
+            if frame is None:
+                return
+            yield frame
+    finally:
+        stop.set()
 
 
 def _gtts_tts(text: str, lang_code: str = "en") -> Optional[bytes]:
@@ -107,11 +368,12 @@ def _gtts_tts(text: str, lang_code: str = "en") -> Optional[bytes]:
 
 def _pyttsx3_tts(text: str, rate: float = 1.0) -> Optional[bytes]:
     try:
-        _pyttsx3_engine.setProperty('rate', int(150 * rate))
+        engine = _pyttsx3_engine()
+        engine.setProperty('rate', int(150 * rate))
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
             path = f.name
-        _pyttsx3_engine.save_to_file(text, path)
-        _pyttsx3_engine.runAndWait()
+        engine.save_to_file(text, path)
+        engine.runAndWait()
         with open(path, "rb") as f:
             data = f.read()
         os.unlink(path)
@@ -121,19 +383,21 @@ def _pyttsx3_tts(text: str, rate: float = 1.0) -> Optional[bytes]:
         return None
 
 
-def _azure_tts(text: str, lang: str = "en-US", rate: float = 1.0) -> Optional[bytes]:
-    try:
-        voice = AZURE_VOICES.get(lang, AZURE_VOICES["en-US"])
-        pct   = int((rate - 1) * 100)
-        rate_str = f"+{pct}%" if pct >= 0 else f"{pct}%"
-        ssml = f"""<speak version='1.0' xml:lang='{lang}'>
+def _azure_ssml(text: str, lang: str, rate: float) -> str:
+    voice = AZURE_VOICES.get(lang, AZURE_VOICES["en-US"])
+    pct   = int((rate - 1) * 100)
+    rate_str = f"+{pct}%" if pct >= 0 else f"{pct}%"
+    return f"""<speak version='1.0' xml:lang='{lang}'>
   <voice name='{voice}'>
     <prosody rate='{rate_str}'>{text}</prosody>
   </voice>
 </speak>"""
-        cfg     = speechsdk.SpeechConfig(subscription=AZURE_KEY, region=AZURE_REGION)
-        synth   = speechsdk.SpeechSynthesizer(speech_config=cfg, audio_config=None)
-        result  = synth.speak_ssml(ssml)
+
+
+def _azure_tts(text: str, lang: str = "en-US", rate: float = 1.0) -> Optional[bytes]:
+    try:
+        synth   = _azure_synthesizer()
+        result  = synth.speak_ssml(_azure_ssml(text, lang, rate))
         if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
             return result.audio_data
         logger.error(f"Azure TTS reason: {result.reason}")
@@ -141,3 +405,21 @@ def _azure_tts(text: str, lang: str = "en-US", rate: float = 1.0) -> Optional[by
     except Exception as e:
         logger.error(f"Azure TTS error: {e}")
         return None
+
+
+def _azure_tts_stream(text: str, lang: str = "en-US", rate: float = 1.0) -> Iterator[bytes]:
+    """Yield audio blocks as Azure produces them (returns after synthesis starts)."""
+    try:
+        synth  = _azure_synthesizer()
+        result = synth.start_speaking_ssml_async(_azure_ssml(text, lang, rate)).get()
+        stream = speechsdk.AudioDataStream(result)
+        buf    = bytes(STREAM_BLOCK_BYTES)
+        while True:
+            n = stream.read_data(buf)
+            if not n:
+                break
+            yield buf[:n]
+        if stream.status == speechsdk.StreamStatus.Canceled:
+            logger.error(f"Azure TTS stream cancelled: {stream.cancellation_details.reason}")
+    except Exception as e:
+        logger.error(f"Azure TTS stream error: {e}")
@@ -0,0 +1,193 @@
+"""
+VOICE4BLIND — Worker Pool
+Runs blocking / CPU-bound work (document parsing, synthesis) off the
+asyncio event loop, with a queue-depth limit and per-job timeouts.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from .metrics import METRICS
+
+logger = logging.getLogger("voice4blind.pool")
+
+# Worker processes never fork from the server itself: by the time a pool
+# starts, the event loop, to_thread and TTS threads are running, and a
+# fork taken while one of them holds a lock (METRICS, logging) leaves the
+# child waiting on it forever. forkserver forks from a clean helper.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when a pool already has max_pending jobs queued or running."""
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised when a worker process died running the job (twice); the pool was restarted."""
+
+
+def _measured_call(fn: Callable, *args: Any):
+    """Runs in a worker process: fn's result plus the metrics it recorded."""
+    result = fn(*args)
+    return result, METRICS.drain()  # drain() empties it, so each job reports only its own
+
+
+def _terminate(executor: Executor):
+    """Stop an executor now, killing its worker processes mid-job."""
+    # Before shutdown(), which drops the process table
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    # Queued jobs are not cancelled: they fail with BrokenExecutor instead,
+    # which run() retries on the new pool
+    executor.shutdown(wait=False)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+class WorkerPool:
+    """
+    Bounded executor wrapper.
+
+    kind="process" for CPU-bound parsing, kind="thread" for I/O-bound or
+    GIL-releasing work. A job counts against max_pending until it actually
+    finishes in the worker — a job whose caller timed out keeps its slot
+    until the worker is free again, so backpressure reflects real load.
+
+    A process pool restarts itself when a worker dies (crash, OOM) and
+    when a job times out, which is the only way to stop a hung parse.
+    Jobs lost to a restart are run once more on the new pool.
+    """
+
+    def __init__(self, name: str, kind: str = "process", max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, timeout: Optional[float] = None,
+                 initializer: Optional[Callable] = None):
+        self.name        = name
+        self.kind        = kind
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.max_workers * 4
+        self.timeout     = timeout
+        self.initializer = initializer
+
+        self._executor: Optional[Executor] = None
+        self._pending   = 0
+        self._lock      = threading.Lock()
+        self.completed  = 0
+        self.rejected   = 0
+        self.timed_out  = 0
+        self.restarts   = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=self.initializer,
+                    mp_context=_MP_CONTEXT)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name,
+                    initializer=self.initializer)
+        return self._executor
+
+    def _restart(self, executor: Executor):
+        """Replace `executor` with a fresh one, unless that already happened."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+        logger.warning(f"Restarting {self.name} pool")
+        _terminate(executor)
+
+    def _release(self, _fut: Future):
+        with self._lock:
+            self._pending   -= 1
+            self.completed  += 1
+
+    @property
+    def depth(self) -> int:
+        """Jobs queued or running."""
+        return self._pending
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        """Submit without awaiting; raises PoolBusyError when saturated."""
+        return self._submit(fn, *args)[1]
+
+    def _submit(self, fn: Callable, *args: Any) -> Tuple[Executor, Future]:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusyError(f"{self.name} pool is busy ({self._pending} jobs pending)")
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            try:
+                fut = executor.submit(fn, *args)
+            except BrokenExecutor:
+                self._restart(executor)
+                executor = self._get_executor()
+                fut = executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        fut.add_done_callback(self._release)
+        return executor, fut
+
+    async def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(*args) in the pool; raises PoolBusyError, asyncio.TimeoutError
+        or WorkerCrashedError.
+        """
+        # Metrics recorded inside a worker process travel back with the result
+        remote = METRICS.enabled and self.kind == "process"
+        call   = (_measured_call, fn, *args) if remote else (fn, *args)
+        name   = getattr(fn, "__name__", "?")
+        started = time.perf_counter()
+        for attempt in range(2):
+            executor, fut = self._submit(*call)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(fut), timeout or self.timeout)
+                break
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                logger.warning(f"{self.name} job {name} timed out")
+                if self.kind == "process":
+                    self._restart(executor)
+                raise
+            except BrokenExecutor:
+                # This job's worker died, or a restart for another job took
+                # the pool down under it: either way, once more on a new pool
+                self._restart(executor)
+                if attempt:
+                    raise WorkerCrashedError(f"{self.name} worker died running {name}")
+        # Queue wait included: this is what the caller experiences
+        METRICS.observe("pool_job_seconds", time.perf_counter() - started,
+                        pool=self.name, fn=name)
+        if remote:
+            result, recorded = result
+            METRICS.merge(recorded)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "kind":        self.kind,
+            "workers":     self.max_workers,
+            "pending":     self._pending,
+            "max_pending": self.max_pending,
+            "completed":   self.completed,
+            "rejected":    self.rejected,
+            "timed_out":   self.timed_out,
+            "restarts":    self.restarts,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
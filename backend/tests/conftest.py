@@ -0,0 +1,15 @@
+"""
+Shared setup: tests import the backend the way uvicorn does (from
+backend/), and every cache lives in a throwaway directory.
+"""
+
+import os
+import sys
+import pathlib
+import tempfile
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+# Before main is imported: its stores are created at import time
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="voice4blind-tests-"))
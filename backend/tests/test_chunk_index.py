@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from benchmarks.corpus import make_text
+from modules.chunk_index import ChunkIndexStore
+
+DOC_ID = "0123456789abcdef"
+TOC    = [(1, "Chapter 1", 1), (1, "Chapter 2", 4)]
+
+
+@pytest.fixture
+def pages():
+    return [make_text(300, seed=i) for i in range(6)]
+
+
+def test_round_trip(tmp_path, pages):
+    built = ChunkIndexStore(tmp_path, version=1).build(DOC_ID, pages, "book.pdf", TOC)
+
+    # A fresh store (server restart) reads the same index back from disk
+    index = ChunkIndexStore(tmp_path, version=1).get(DOC_ID)
+    assert index is not None
+    assert (index.doc_id, index.filename) == (DOC_ID, "book.pdf")
+    assert list(index) == list(built)
+    assert " ".join(index).split() == " ".join(pages).split()
+    assert index[-1] == index[len(index) - 1]
+    assert index.texts(2, 5) == list(index)[2:5]
+
+    window = index.window(1, 3)
+    assert [c["index"] for c in window] == [1, 2, 3]
+    assert [c["page"] for c in window] == index.pages[1:4]
+    assert index.pages == sorted(index.pages) and set(index.pages) <= set(range(1, 7))
+
+    assert [e["title"] for e in index.outline.entries] == ["Chapter 1", "Chapter 2"]
+    chapter2 = index.outline.find("chapter two")["chunk"]
+    assert index.pages[chapter2] <= 4 <= index.pages[chapter2 + 1]
+
+
+def test_stale_version_or_chunk_size_is_a_miss(tmp_path, pages):
+    ChunkIndexStore(tmp_path, version=1).build(DOC_ID, pages)
+    assert ChunkIndexStore(tmp_path, version=2).get(DOC_ID) is None
+    assert ChunkIndexStore(tmp_path, version=1, words_per_chunk=40).get(DOC_ID) is None
+
+
+@pytest.mark.parametrize("doc_id", ["../..", "..", "0123456789ABCDEF", "0123456789abcdef/..", "", None, 5])
+def test_rejects_ids_that_are_not_digests(tmp_path, pages, doc_id):
+    store = ChunkIndexStore(tmp_path / "chunks", version=1)
+    assert store.get(doc_id) is None
+    with pytest.raises(ValueError):
+        store.build(doc_id, pages)
+    assert not any(tmp_path.glob("*.json"))
+
+
+def test_concurrent_builds_of_one_document(tmp_path, pages):
+    store  = ChunkIndexStore(tmp_path, version=1)
+    errors = []
+
+    def build():
+        try:
+            store.build(DOC_ID, pages, "book.pdf", TOC)
+        except Exception as e:
+            errors.append(e)
+
+    for _ in range(5):
+        threads = [threading.Thread(target=build) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert errors == []
+    assert sorted(p.name for p in (tmp_path / DOC_ID).iterdir()) == ["chunks.txt", "index.json", "outline.json"]
+    index = ChunkIndexStore(tmp_path, version=1).get(DOC_ID)
+    assert " ".join(index).split() == " ".join(pages).split()
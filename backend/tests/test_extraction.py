@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import main
+from benchmarks.corpus import generate
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """Counts documents parsed in EXTRACT_POOL (count_pages opens each parse)."""
+    parses = []
+    run = main.EXTRACT_POOL.run
+
+    async def counted(fn, *args, **kwargs):
+        if fn is main.count_pages:
+            parses.append(args[0])
+        return await run(fn, *args, **kwargs)
+
+    monkeypatch.setattr(main.EXTRACT_POOL, "run", counted)
+    return parses
+
+
+def test_concurrent_opens_parse_once(tmp_path, count_parses):
+    path = str(generate(tmp_path, ".pdf", 12, seed=1))
+
+    async def open_three():
+        return await asyncio.gather(*(main.extract_text_async(path) for _ in range(3)))
+
+    texts = asyncio.run(open_three())
+    assert len(count_parses) == 1
+    assert texts[0] and texts.count(texts[0]) == 3
+    assert main._extracting == {}
+
+    doc_id = main.EXTRACT_CACHE.document_id(path)
+    index  = main.CHUNK_INDEX.get(doc_id)
+    assert index is not None and len(index) > 0
+    assert sorted(p.name for p in index.directory.iterdir()) == ["chunks.txt", "index.json", "outline.json"]
+
+    # Reopening is a cache hit
+    assert asyncio.run(main.extract_text_async(path)) == texts[0]
+    assert len(count_parses) == 1
+
+
+def test_waiting_opener_takes_over_a_cancelled_extraction(tmp_path, count_parses):
+    path = str(generate(tmp_path, ".pdf", 60, seed=2))
+
+    async def race():
+        first = asyncio.ensure_future(main.extract_text_async(path))
+        while not main._extracting:
+            await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(main.extract_text_async(path))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(race())
+    assert isinstance(first, asyncio.CancelledError)
+    assert isinstance(second, str) and second
+    assert len(count_parses) == 2
+    assert main._extracting == {}
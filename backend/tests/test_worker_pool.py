@@ -0,0 +1,89 @@
+import os
+import time
+import asyncio
+
+import pytest
+
+from modules.worker_pool import PoolBusyError, WorkerCrashedError, WorkerPool
+
+
+# Jobs run in worker processes, so they must be importable module functions
+def double(x):
+    return x * 2
+
+
+def die():
+    os._exit(1)  # as a segfault or the OOM killer would
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("test", kind="process", max_workers=2, timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_jobs(pool):
+    async def main():
+        return await asyncio.gather(*(pool.run(double, i) for i in range(6)))
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8, 10]
+    assert pool.stats()["pending"] == 0
+
+
+def test_recovers_after_a_worker_dies(pool):
+    async def main():
+        assert await pool.run(double, 1) == 2
+        with pytest.raises(WorkerCrashedError):
+            await pool.run(die)
+        return await pool.run(double, 21)
+
+    assert asyncio.run(main()) == 42
+    assert pool.stats()["restarts"] >= 1
+    assert pool.stats()["pending"] == 0
+
+
+def test_timeout_stops_the_hung_job(pool):
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(sleep, 60, timeout=0.5)
+        # The pool was restarted: both workers take new jobs at once
+        started = time.perf_counter()
+        results = await asyncio.gather(pool.run(sleep, 0.1), pool.run(sleep, 0.1))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(main())
+    assert results == [0.1, 0.1] and elapsed < 5
+    assert pool.stats()["timed_out"] == 1 and pool.stats()["restarts"] == 1
+
+
+def test_jobs_lost_to_a_restart_run_again():
+    pool = WorkerPool("test", kind="process", max_workers=1, timeout=5)
+
+    async def main():
+        hung   = pool.run(sleep, 60, timeout=0.5)
+        queued = pool.run(double, 4)  # waits behind the hung job in the old pool
+        return await asyncio.gather(hung, queued, return_exceptions=True)
+
+    try:
+        hung, queued = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert isinstance(hung, asyncio.TimeoutError)
+    assert queued == 8
+
+
+def test_rejects_work_past_max_pending():
+    pool = WorkerPool("test", kind="thread", max_workers=1, max_pending=1)
+    try:
+        pool.submit(time.sleep, 0.2)
+        with pytest.raises(PoolBusyError):
+            pool.submit(time.sleep, 0.2)
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.corpus import make_text
+from modules import tts_engine
+
+DOC_ID = "feedfacecafebeef"
+
+
+@pytest.fixture(scope="module")
+def book():
+    """Three chapters of three pages each, indexed as an upload would be."""
+    pages = [(f"Chapter {n // 3 + 1}\n" if n % 3 == 0 else "") + make_text(300, seed=n) for n in range(9)]
+    toc   = [(1, f"Chapter {c}", 3 * c - 2) for c in (1, 2, 3)]
+    index = main.CHUNK_INDEX.build(DOC_ID, pages, "book.pdf", toc)
+    return {e["title"]: e["chunk"] for e in index.outline.entries}
+
+
+@pytest.fixture
+def ws(monkeypatch):
+    # No server voice: replies carry text only, and nothing goes to the network
+    for backend in ("GTTS_AVAILABLE", "PYTTSX3_AVAILABLE", "AZURE_AVAILABLE"):
+        monkeypatch.setattr(tts_engine, backend, False)
+    with TestClient(main.app) as client, client.websocket_connect("/ws") as ws:
+        yield ws
+
+
+def command(ws, transcript: str) -> dict:
+    ws.send_json({"action": "command", "transcript": transcript, "doc_id": DOC_ID})
+    reply = ws.receive_json()
+    assert reply["type"] == "command_result"
+    return reply
+
+
+def test_chapter_navigation(ws, book):
+    assert command(ws, "read chapter three")["position"] == book["Chapter 3"]
+
+    reply = command(ws, "read chapter one")
+    assert (reply["action"], reply["position"]) == ("jump_chapter", book["Chapter 1"])
+
+    assert command(ws, "next chapter")["position"] == book["Chapter 2"]
+    assert command(ws, "go to chapter three")["position"] == book["Chapter 3"]
+    assert command(ws, "previous chapter")["position"] == book["Chapter 2"]
+
+
+def test_read_chapter_resumes_paused_reading(ws, book):
+    assert command(ws, "pause")["paused"] is True
+    reply = command(ws, "read chapter two")
+    assert reply["position"] == book["Chapter 2"] and reply["paused"] is False
+
+
+def test_unknown_chapter_stays_put(ws, book):
+    start = command(ws, "read chapter two")["position"]
+    reply = command(ws, "read chapter nine")
+    assert reply["action"] == "noop" and reply["position"] == start
+    assert reply["say"] == "I could not find that chapter."
+
+
+def test_read_this_chapter_does_not_jump(ws, book):
+    start = command(ws, "read chapter three")["position"]
+    command(ws, "next")
+    reply = command(ws, "read this chapter")
+    assert reply["action"] == "start_read" and reply["position"] == start + 1